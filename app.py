@@ -87,11 +87,25 @@ def process_question(user_input, title_query, model_choice, search_type):
     st.session_state.question_id = str(uuid.uuid4())
     with st.spinner("Processing..."):
         start_time = time.time()
-        answer_data = get_answer(user_input, title_query, model_choice, search_type)
+        answer_placeholder = st.empty()
+        streamed_answer = []
+
+        def show_token(token):
+            streamed_answer.append(token)
+            answer_placeholder.write("".join(streamed_answer))
+
+        answer_data = get_answer(
+            user_input,
+            title_query,
+            model_choice,
+            search_type,
+            on_token=show_token,
+            evaluate=True,
+        )
         end_time = time.time()
         print_log(f"Answer received in {end_time - start_time:.2f} seconds")
         st.success("Completed!")
-        st.write(answer_data["answer"])
+        answer_placeholder.write(answer_data["answer"])
         display_answer_metadata(answer_data)
         save_conversation(
             st.session_state.conversation_id,
@@ -164,8 +178,12 @@ def display_recent_conversations():
     relevance_filter = st.selectbox(
         "Filter by relevance:", ["All", "RELEVANT", "PARTLY_RELEVANT", "NON_RELEVANT"]
     )
-    recent_conversations = get_recent_conversations(
-        limit=5, relevance=relevance_filter if relevance_filter != "All" else None
+    # Materialized before rendering, so a rerun can't abort the script while
+    # the generator still holds a pooled connection and its transaction
+    recent_conversations = list(
+        get_recent_conversations(
+            limit=5, relevance=relevance_filter if relevance_filter != "All" else None
+        )
     )
     for conv in recent_conversations:
         st.write(f"Q: {conv['question']}")
@@ -15,11 +15,7 @@ from prefect.states import StateType
 from prefect.utilities.annotations import quote
 
 from utils.postgres import init_db
-from utils.prefect import (
-    create_deployment_run,
-    get_deployment_id_by_name,
-    monitor_run_status,
-)
+from utils.prefect import run_deployment_and_wait
 from utils.tasks import (
     check_for_new_data,
     chunk_episodes,
@@ -210,24 +206,16 @@ def process_new_episodes(bucket_dir):
             "new_episodes_dirs": new_dirs,
         }
 
-        # Run the flow with parameters
-        deployment_name = "ad-hoc"
-        flow_name = "setup_es"
-        deployment_id = asyncio.run(
-            get_deployment_id_by_name(
-                deployment_name=deployment_name,
-                flow_name=flow_name,
-            )
-        )
-
-        run = asyncio.run(
-            create_deployment_run(
-                deployment_id=deployment_id,
+        # Run the flow with parameters and wait for it to finish
+        run, run_state = asyncio.run(
+            run_deployment_and_wait(
+                deployment_name="ad-hoc",
+                flow_name="setup_es",
                 parameters=params,
             )
         )
 
-        if asyncio.run(monitor_run_status(run.id)) == StateType.COMPLETED:
+        if run_state == StateType.COMPLETED:
             task(update_bucket_state, log_prints=True)(bucket_dir, new_dirs)
         else:
             print(
@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the unit tests.
+"""
+
+import importlib
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def postgres(monkeypatch):
+    """
+    Fixture to import utils.postgres offline: `utils.variables` connects to
+    Elasticsearch at import, so it is replaced with the Postgres settings.
+    """
+    variables = types.ModuleType("utils.variables")
+    for name in (
+        "POSTGRES_DB",
+        "POSTGRES_HOST",
+        "POSTGRES_PASSWORD",
+        "POSTGRES_PORT",
+        "POSTGRES_USER",
+    ):
+        setattr(variables, name, "test")
+    monkeypatch.setitem(sys.modules, "utils.variables", variables)
+    monkeypatch.delitem(sys.modules, "utils.postgres", raising=False)
+
+    yield importlib.import_module("utils.postgres")
+
+    sys.modules.pop("utils.postgres", None)
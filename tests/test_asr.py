@@ -6,9 +6,15 @@ Unit tests for utils.asr module.
 from pathlib import Path
 
 import numpy as np
+import pytest
 
 # from utils.asr import read_mp3
-from utils.asr import merge_transcripts, sample_audio, update_sampling_rate
+from utils.asr import (
+    merge_transcripts,
+    sample_audio,
+    transcribe_segments,
+    update_sampling_rate,
+)
 
 PROJECT_DIR = Path(__file__).resolve().parent.parent
 
@@ -196,3 +202,68 @@ def test_merge_transcripts():
     result = merge_transcripts(transcripts)
     expected = ""  # Expecting an empty string
     assert result == expected
+
+
+def test_transcribe_segments():
+    """
+    test transcribe_segments function
+    """
+
+    class Batch(list):
+        """Batch of segments, standing in for a tensor."""
+
+        def to(self, *args, **kwargs):  # pylint: disable=unused-argument
+            """Move the batch to a device and dtype."""
+            return self
+
+    class Features:  # pylint: disable=too-few-public-methods
+        """Processor output holding the batch of segments."""
+
+        def __init__(self, input_features):
+            self.input_features = Batch(input_features)
+
+    class Processor:
+        """Fake processor transcribing each segment as its first sample."""
+
+        def __call__(self, audio, **kwargs):  # pylint: disable=unused-argument
+            return Features(audio)
+
+        def batch_decode(
+            self, predicted_ids, **kwargs
+        ):  # pylint: disable=unused-argument
+            """Decode each segment."""
+            return [str(int(segment[0])) for segment in predicted_ids]
+
+    class Model:  # pylint: disable=too-few-public-methods
+        """Fake model running out of memory on batches of more than 2 segments."""
+
+        device = "cpu"
+        dtype = None
+
+        def __init__(self):
+            self.batch_sizes = []
+
+        def generate(self, input_features):
+            """Generate predictions for a batch."""
+            if len(input_features) > 2:
+                raise RuntimeError("CUDA out of memory")
+            self.batch_sizes.append(len(input_features))
+            return input_features
+
+    segments = [np.full(4, i) for i in range(7)]
+    model = Model()
+
+    # Test 1: Transcripts keep the order of the segments
+    result = transcribe_segments(iter(segments), Processor(), model, batch_size=8)
+    assert result == [str(i) for i in range(7)]
+
+    # Test 2: The batch size is halved until the batches fit in memory
+    assert model.batch_sizes == [2, 2, 2, 1]
+
+    # Test 3: Other errors are raised
+    def fail(input_features):
+        raise RuntimeError("device-side assert")
+
+    model.generate = fail
+    with pytest.raises(RuntimeError, match="device-side assert"):
+        transcribe_segments(segments, Processor(), model)
@@ -5,6 +5,7 @@ Unit tests for utils.elasticsearch module.
 import pytest
 
 from utils.elasticsearch import (
+    bulk_index_documents,
     create_elasticsearch_client,
     create_elasticsearch_index,
     delete_indexed_document,
@@ -128,3 +129,26 @@ def test_delete_document(es_client, test_index, setup_index):
     # Check that the document count is 0 after deletion
     count = get_indexed_documents_count(es_client, test_index)
     assert count["count"] == 0
+
+
+def test_bulk_index_documents(es_client, test_index, setup_index):
+    """Test bulk indexing documents, replacing previously indexed ones."""
+    _ = setup_index
+    documents = [
+        {"id": "1", "chunk_id": str(i), "text": f"This is test document {i}."}
+        for i in range(3)
+    ]
+
+    status = bulk_index_documents(es_client, test_index, documents, chunk_size=2)
+    assert status == {"removed": 0, "indexed": 3}
+
+    es_client.indices.refresh(index=test_index)
+
+    # Re-indexing replaces the documents instead of duplicating them
+    status = bulk_index_documents(es_client, test_index, documents[:2])
+    assert status == {"removed": 2, "indexed": 2}
+
+    es_client.indices.refresh(index=test_index)
+
+    count = get_indexed_documents_count(es_client, test_index)
+    assert count["count"] == 3
@@ -0,0 +1,55 @@
+"""
+Unit tests for utils.embedding_cache module.
+"""
+
+from utils.embedding_cache import (
+    get_cached_embedding,
+    get_or_compute,
+    get_or_compute_many,
+)
+
+
+def test_get_or_compute(tmp_path):
+    """
+    test get_or_compute function
+    """
+    cache_path = str(tmp_path / "cache" / "embeddings.sqlite")
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return [0.5, float(len(text))]
+
+    first = get_or_compute(cache_path, "m", "abc", compute)
+    second = get_or_compute(cache_path, "m", "abc", compute)
+
+    # Computed once, then served from the cache as float32 values
+    assert first == second == [0.5, 3.0]
+    assert calls == ["abc"]
+
+    # Keys depend on the model too
+    assert get_cached_embedding(cache_path, "other", "abc") is None
+    get_or_compute(cache_path, "other", "abc", compute)
+    assert calls == ["abc", "abc"]
+
+
+def test_get_or_compute_many(tmp_path):
+    """
+    test get_or_compute_many function
+    """
+    cache_path = str(tmp_path / "embeddings.sqlite")
+    get_or_compute(cache_path, "m", "b", lambda text: [1.0])
+    calls = []
+
+    def compute_many(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    embeddings = get_or_compute_many(cache_path, "m", ["a", "b", "cc"], compute_many)
+
+    # Misses are computed in one call, and results keep the order of the texts
+    assert embeddings == [[1.0], [1.0], [2.0]]
+    assert calls == [["a", "cc"]]
+
+    get_or_compute_many(cache_path, "m", ["cc", "a"], compute_many)
+    assert len(calls) == 1
@@ -0,0 +1,48 @@
+"""
+Unit tests for utils.llm_cache module.
+"""
+
+import hashlib
+
+from utils.llm_cache import CREATE_TABLE_SQL, get_cached_response, set_cached_response
+from utils.sqlite_cache import LOCK, get_connection
+
+
+def test_cached_response(tmp_path):
+    """
+    test get_cached_response and set_cached_response functions
+    """
+    cache_path = str(tmp_path / "cache" / "llm_responses.sqlite")
+    kwargs = {"temperature": 0, "response_format": {"type": "json_object"}}
+
+    assert get_cached_response(cache_path, "m", "p", kwargs) is None
+    set_cached_response(cache_path, "m", "p", "answer", kwargs)
+
+    # Served for the same arguments, whatever their order
+    reordered = {"response_format": {"type": "json_object"}, "temperature": 0}
+    assert get_cached_response(cache_path, "m", "p", reordered) == "answer"
+
+    # Different completion arguments miss the cache
+    assert get_cached_response(cache_path, "m", "p") is None
+    assert get_cached_response(cache_path, "m", "p", {"temperature": 0.7}) is None
+    assert get_cached_response(cache_path, "other", "p", kwargs) is None
+
+
+def test_legacy_entries_ignored(tmp_path):
+    """
+    test that entries keyed without the completion kwargs are not served
+    """
+    cache_path = str(tmp_path / "llm_responses.sqlite")
+    kwargs = {"temperature": 0}
+
+    # Entry stored under the previous (model, prompt) key layout
+    legacy_key = hashlib.sha256("m\x00p".encode("utf-8")).hexdigest()
+    conn = get_connection(cache_path, CREATE_TABLE_SQL)
+    with LOCK, conn:
+        conn.execute(
+            "INSERT INTO responses (key, answer) VALUES (?, ?)",
+            (legacy_key, "sampled"),
+        )
+
+    assert get_cached_response(cache_path, "m", "p", kwargs) is None
+    assert get_cached_response(cache_path, "m", "p") is None
@@ -0,0 +1,34 @@
+"""
+Unit tests for utils.multithread module.
+"""
+
+import threading
+
+from utils.multithread import map_progress
+
+
+def test_map_progress():
+    """
+    test map_progress function
+    """
+    # Test 1: Results keep the order of the input sequence
+    result = map_progress(lambda x: x * 2, list(range(50)), verbose=False)
+    assert result == [x * 2 for x in range(50)]
+
+    # Test 2: Items run concurrently when max_workers > 1
+    barrier = threading.Barrier(4, timeout=5)
+
+    def wait_for_all(x):
+        barrier.wait()
+        return x
+
+    result = map_progress(wait_for_all, [1, 2, 3, 4], max_workers=4, verbose=False)
+    assert result == [1, 2, 3, 4]
+
+    # Test 3: Explicit single worker still processes everything
+    result = map_progress(lambda x: x, ["a", "b"], max_workers=1, verbose=False)
+    assert result == ["a", "b"]
+
+    # Test 4: Worker processes for picklable functions
+    result = map_progress(abs, [-1, 2, -3], processes=True, verbose=False)
+    assert result == [1, 2, 3]
@@ -0,0 +1,121 @@
+"""
+Unit tests for utils.ollama module.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from utils.ollama import (
+    aembed_all,
+    embed_document,
+    embed_documents_batch,
+    get_embedding,
+)
+
+
+class FakeEmbeddingsClient:  # pylint: disable=too-few-public-methods
+    """Fake OpenAI-compatible client returning the text length as embedding."""
+
+    def __init__(self):
+        self.calls = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, input, model):  # pylint: disable=redefined-builtin
+        """Record the call and embed each text as [len(text)]."""
+        self.calls.append((list(input), model))
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=i, embedding=[float(len(text))])
+                for i, text in enumerate(input)
+            ]
+        )
+
+
+def test_embed_documents_batch():
+    """
+    test embed_documents_batch function
+    """
+    client = FakeEmbeddingsClient()
+    documents = [{"title": "t", "text": "x" * i} for i in range(5)]
+
+    result = embed_documents_batch(
+        client, documents, keys=["title", "text"], batch_size=2, model_name="m"
+    )
+
+    # Documents are updated in place and keep their order
+    assert result is documents
+    assert [doc["text_vector"].tolist() for doc in documents] == [
+        [float(len(("t " + "x" * i).strip()))] for i in range(5)
+    ]
+    assert documents[0]["text_vector"].dtype == np.float32
+
+    # One request per batch, whitespace normalized like in get_embedding
+    assert [len(texts) for texts, _ in client.calls] == [2, 2, 1]
+    assert client.calls[0] == (["t", "t x"], "m")
+    assert get_embedding(client, "t\nx  ", model_name="m") == [3.0]
+    assert client.calls[-1] == (["t x"], "m")
+
+
+def test_get_embedding_cache():
+    """
+    test get_embedding function caching
+    """
+    client = FakeEmbeddingsClient()
+
+    first = get_embedding(client, "a\nb", model_name="m")
+    first.append(0.0)
+    second = get_embedding(client, "a b", model_name="m")
+
+    # Same normalized text is embedded once, and the cached vector is not shared
+    assert second == [3.0]
+    assert client.calls == [(["a b"], "m")]
+
+    # Whitespace variants of a text share its cache entry
+    get_embedding(client, "  a \t b\n", model_name="m")
+    assert len(client.calls) == 1
+
+    get_embedding(client, "a b", model_name="other")
+    assert len(client.calls) == 2
+
+    # Documents bypass the cache
+    for _ in range(2):
+        embed_document(client, {"text": "a\nb"}, keys=["text"], model_name="m")
+    assert client.calls[-2:] == [(["a b"], "m")] * 2
+
+
+class FakeAsyncEmbeddingsClient:  # pylint: disable=too-few-public-methods
+    """Fake async client tracking the peak number of in-flight requests."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    async def create(
+        self, input, model
+    ):  # pylint: disable=redefined-builtin,unused-argument
+        """Embed the single text as [len(text)] after yielding to the loop."""
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(input[0]))])])
+
+
+def test_aembed_all():
+    """
+    test aembed_all function
+    """
+    client = FakeAsyncEmbeddingsClient()
+    documents = [{"text": "x" * i} for i in range(10)]
+
+    result = asyncio.run(aembed_all(client, documents, concurrency=3, keys=["text"]))
+
+    # Documents are updated in place and concurrency is bounded
+    assert result is documents
+    assert [doc["text_vector"].tolist() for doc in documents] == [
+        [float(i)] for i in range(10)
+    ]
+    assert client.peak == 3
@@ -0,0 +1,150 @@
+"""
+Unit tests for utils.postgres module.
+"""
+
+import queue
+from contextlib import contextmanager, nullcontext
+from types import SimpleNamespace
+
+import psycopg
+import pytest
+
+
+class FakePool:  # pylint: disable=too-few-public-methods
+    """
+    Fake connection pool recording committed rows. Batches are atomic and
+    fail on any bad row; the first `transient_failures` batches fail with
+    an OperationalError.
+    """
+
+    def __init__(self, bad_ids=(), transient_failures=0):
+        self.bad_ids = set(bad_ids)
+        self.transient_failures = transient_failures
+        self.batches = 0
+        self.single_inserts = 0
+        self.timeouts = []
+        self.saved = []
+
+    @contextmanager
+    def connection(self, timeout=None, **conn_info):  # pylint: disable=unused-argument
+        """Yield a fake connection, recording the requested timeout."""
+        self.timeouts.append(timeout)
+        yield FakeConnection(self)
+
+
+class FakeConnection:
+    """Fake psycopg connection of a `FakePool`."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def transaction(self):
+        """Return a no-op transaction block."""
+        return nullcontext()
+
+    def pipeline(self):
+        """Return a no-op pipeline block."""
+        return nullcontext()
+
+    def cursor(self):
+        """Return the connection itself as its cursor."""
+        return nullcontext(self)
+
+    def executemany(self, query, rows):  # pylint: disable=unused-argument
+        """Save all rows, or none of them if the batch fails."""
+        self.pool.batches += 1
+        if self.pool.batches <= self.pool.transient_failures:
+            raise psycopg.OperationalError("connection lost")
+        if any(row[0] in self.pool.bad_ids for row in rows):
+            raise psycopg.IntegrityError("bad row in batch")
+        self.pool.saved.extend(rows)
+
+    def execute(self, query, row):  # pylint: disable=unused-argument
+        """Save a single row, failing if it's a bad one."""
+        self.pool.single_inserts += 1
+        if row[0] in self.pool.bad_ids:
+            raise psycopg.IntegrityError(f"bad row {row[0]}")
+        self.pool.saved.append(row)
+
+
+@pytest.fixture
+def fake_pool(postgres, monkeypatch):
+    """Fixture to route pooled connections to a `FakePool`."""
+
+    def install(**kwargs):
+        pool = FakePool(**kwargs)
+        monkeypatch.setattr(postgres, "get_pooled_connection", pool.connection)
+        monkeypatch.setattr(postgres, "WRITE_RETRY_DELAY", 0)
+        return pool
+
+    return install
+
+
+def test_insert_conversations_retries_transient_errors(postgres, fake_pool):
+    """
+    test _insert_conversations function with transient batch failures
+    """
+    pool = fake_pool(transient_failures=2)
+    rows = [(str(i), "q") for i in range(5)]
+
+    postgres._insert_conversations(rows)  # pylint: disable=protected-access
+
+    # Retried as a batch until it went through, with a short connect timeout
+    assert pool.batches == 3
+    assert pool.saved == rows
+    assert set(pool.timeouts) == {postgres.WRITE_CONNECT_TIMEOUT}
+
+
+def test_insert_conversations_isolates_bad_rows(postgres, fake_pool):
+    """
+    test _insert_conversations function with a bad row in the batch
+    """
+    pool = fake_pool(bad_ids={"2"})
+    rows = [(str(i), "q") for i in range(5)]
+
+    postgres._insert_conversations(rows)  # pylint: disable=protected-access
+
+    # Not retried as a batch; every other row is saved on its own
+    assert pool.batches == 1
+    assert pool.saved == [row for row in rows if row[0] != "2"]
+    failed = postgres._FAILED_CONVERSATIONS  # pylint: disable=protected-access
+    assert set(failed) == {("2", "q")}
+
+
+def test_insert_conversations_unavailable_database(postgres, fake_pool):
+    """
+    test _insert_conversations function when the database stays unavailable
+    """
+    pool = fake_pool(transient_failures=100)
+    rows = [(str(i), "q") for i in range(3)]
+
+    postgres._insert_conversations(rows)  # pylint: disable=protected-access
+
+    # Retried, but never row by row; every row is recorded as failed
+    assert pool.batches == postgres.WRITE_MAX_RETRIES + 1
+    assert pool.single_inserts == 0
+    failed = postgres._FAILED_CONVERSATIONS  # pylint: disable=protected-access
+    assert set(failed) == {(row[0], "q") for row in rows}
+    assert all(isinstance(e, psycopg.OperationalError) for e in failed.values())
+
+
+def test_flush_conversations(postgres, monkeypatch):
+    """
+    test flush_conversations function with a stalled or dead writer
+    """
+    pending = queue.Queue()
+    pending.put(("0", "q"))
+    monkeypatch.setattr(postgres, "_CONVERSATION_QUEUE", pending)
+
+    # Nothing drains the queue without a writer
+    monkeypatch.setattr(postgres, "_CONVERSATION_WRITER", None)
+    assert postgres.flush_conversations(timeout=60) is False
+
+    # A stalled writer is waited for until the deadline only
+    stalled = SimpleNamespace(is_alive=lambda: True)
+    monkeypatch.setattr(postgres, "_CONVERSATION_WRITER", stalled)
+    assert postgres.flush_conversations(timeout=0.1) is False
+
+    pending.get()
+    pending.task_done()
+    assert postgres.flush_conversations(timeout=0.1) is True
@@ -0,0 +1,66 @@
+"""
+Unit tests for utils.utils module.
+"""
+
+import numpy as np
+
+from utils.utils import (
+    dequantize_vector,
+    normalize_vector,
+    quantize_vector,
+    standardize_array,
+)
+
+
+def test_quantize_vector():
+    """
+    test quantize_vector and dequantize_vector functions
+    """
+    rng = np.random.default_rng(42)
+    vec = rng.normal(size=768).astype(np.float32)
+    unit_vec = vec / np.linalg.norm(vec)
+
+    # Test 1: Default scale maps the largest component to +-127
+    quantized, scale = quantize_vector(vec)
+    assert quantized.dtype == np.int8
+    assert np.abs(quantized).max() == 127
+    assert np.allclose(dequantize_vector(quantized, scale), vec, atol=scale)
+
+    # Test 2: Fixed scale for unit-norm vectors preserves cosine similarity
+    quantized, scale = quantize_vector(unit_vec, scale=1 / 127)
+    restored = dequantize_vector(quantized)
+    cosine = restored @ unit_vec / np.linalg.norm(restored)
+    assert scale == 1 / 127
+    assert cosine > 0.99
+
+    # Test 3: Zero vector doesn't divide by zero
+    quantized, scale = quantize_vector(np.zeros(4))
+    assert scale == 1.0
+    assert np.array_equal(quantized, np.zeros(4, dtype=np.int8))
+
+
+def test_normalize_vector():
+    """
+    test normalize_vector function
+    """
+    normalized = normalize_vector([3, 4])
+    assert normalized.dtype == np.float32
+    assert np.allclose(normalized, [0.6, 0.8])
+
+    # Zero vector doesn't divide by zero
+    assert np.array_equal(normalize_vector(np.zeros(3)), np.zeros(3))
+
+
+def test_standardize_array():
+    """
+    test standardize_array function
+    """
+    samples = np.array([-2, 0, 2, 4], dtype=np.int16)
+
+    standardized = standardize_array(samples)
+    assert standardized.dtype == np.float32
+    assert np.isclose(standardized.mean(), 0)
+    assert np.isclose(standardized.std(), 1)
+
+    # int16 input is left untouched
+    assert samples.tolist() == [-2, 0, 2, 4]
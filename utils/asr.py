@@ -6,6 +6,7 @@ speech-to-text model, and merge the transcribed text into coherent speech.
 
 Dependencies:
     - re
+    - itertools
     - numpy
     - pydub
     - scipy
@@ -13,6 +14,7 @@ Dependencies:
 """
 
 import re
+from itertools import islice
 
 import numpy as np
 from pydub import AudioSegment
@@ -104,7 +106,9 @@ def transcribe_audio(
     Transcribes audio using a pre-trained speech-to-text model.
 
     Args:
-        audio (numpy.ndarray): Audio samples for transcription.
+        audio (numpy.ndarray or list): Audio samples for transcription, or a
+                                       list of audio segments to transcribe
+                                       as one batch.
         processor (object): Processor for preprocessing audio.
         model (object): Pre-trained model for transcription.
         sampling_rate (int, optional): Sampling rate for transcription.
@@ -115,9 +119,10 @@ def transcribe_audio(
     Returns:
         list of str: Transcribed text.
     """
+    # Match the model's device and precision (e.g. float16 on GPU)
     input_features = processor(
         audio, sampling_rate=sampling_rate, return_tensors="pt"
-    ).input_features
+    ).input_features.to(model.device, dtype=model.dtype)
 
     predicted_ids = model.generate(input_features)
 
@@ -169,6 +174,62 @@ def merge_transcripts(transcripts):
     return merged_transcript
 
 
+def transcribe_segments(
+    segments,
+    processor,
+    model,
+    batch_size=16,
+    sampling_rate=16_000,
+    **decode_kwargs,
+):
+    """
+    Transcribes audio segments in batches, so the model runs on several
+    segments per `generate` call.
+
+    Segments are pulled from `segments` one batch at a time. When the model
+    runs out of memory, the batch size is halved and the batch retried.
+
+    Args:
+        segments (iterable of numpy.ndarray): Audio segments, in order.
+        processor (object): Processor for preprocessing audio.
+        model (object): Pre-trained model for transcription.
+        batch_size (int, optional): The number of segments per batch.
+                                    Defaults to 16.
+        sampling_rate (int, optional): Sampling rate of the segments.
+                                       Defaults to 16,000.
+        **decode_kwargs: Additional decoding options passed to `transcribe_audio`.
+
+    Returns:
+        list of str: The transcript of each segment, in order.
+
+    Raises:
+        RuntimeError: If a single segment doesn't fit in memory.
+    """
+    segments = iter(segments)
+    transcripts = []
+    pending = []
+
+    while True:
+        pending += islice(segments, max(batch_size - len(pending), 0))
+        if not pending:
+            break
+
+        batch = pending[:batch_size]
+        try:
+            transcripts += transcribe_audio(
+                batch, processor, model, sampling_rate, **decode_kwargs
+            )
+        except RuntimeError as e:
+            if "out of memory" not in str(e) or batch_size == 1:
+                raise
+            batch_size //= 2
+            continue
+
+        pending = pending[len(batch) :]
+
+    return transcripts
+
+
 def transcribe_episode(
     episode,
     processor,
@@ -188,6 +249,9 @@ def transcribe_episode(
                                    Defaults to 2 minutes.
         target_sampling_rate (int, optional): Sampling rate for transcription.
                                               Defaults to 16,000.
+        batch_size (int, optional): The number of segments transcribed per
+                                    batch (see `transcribe_segments`).
+                                    Defaults to 16.
         **decode_kwargs: Additional decoding options passed to `transcribe_audio`,
                          such as `skip_special_tokens`, `output_word_offsets`, and
                          `return_timestamps`.
@@ -198,7 +262,6 @@ def transcribe_episode(
     minutes = kwargs.get("minutes", 2)
     target_sampling_rate = kwargs.get("target_sampling_rate", 16_000)
 
-    transcripts_list = []
     episode_length = len(episode["array"])
     orig_sampling_rate = episode["sampling_rate"]
 
@@ -209,15 +272,24 @@ def transcribe_episode(
     start_froms = [
         i * minutes for i in range(int(episode_duration_seconds // (minutes * 60)) + 1)
     ]
-
-    for start_from in tqdm(start_froms):
-        if start_from * 60 == episode_duration_seconds:
-            break
-
-        audio = sample_audio(episode, start_from=start_from, minutes=minutes)
-        audio = update_sampling_rate(audio, orig_sampling_rate, target_sampling_rate)
-        transcripts_list += transcribe_audio(
-            audio, processor, model, target_sampling_rate, **kwargs
+    if start_froms[-1] * 60 == episode_duration_seconds:
+        start_froms.pop()
+
+    # Segments are resampled lazily, one batch at a time
+    segments = (
+        update_sampling_rate(
+            sample_audio(episode, start_from=start_from, minutes=minutes),
+            orig_sampling_rate,
+            target_sampling_rate,
         )
+        for start_from in tqdm(start_froms)
+    )
+    transcripts_list = transcribe_segments(
+        segments,
+        processor,
+        model,
+        sampling_rate=target_sampling_rate,
+        **kwargs,
+    )
 
     return merge_transcripts(transcripts_list)
@@ -6,17 +6,30 @@ Custom exceptions are also handled for connection and query errors.
 """
 
 import json
+import time
 
 from elasticsearch import Elasticsearch
-from elasticsearch.exceptions import NotFoundError, RequestError
+from elasticsearch.exceptions import ConnectionTimeout, NotFoundError, RequestError
+from elasticsearch.helpers import parallel_bulk
+from tqdm.auto import tqdm
 
 from exceptions.exceptions import ElasticsearchConnectionError
 
+REQUEST_TIMEOUT = 30
+CONNECTIONS_PER_NODE = 32
+
+BULK_CHUNK_SIZE = 500
+BULK_THREAD_COUNT = 4
+BULK_MAX_RETRIES = 3
+
 
 def create_elasticsearch_client(host, port):
     """
     Create and return an Elasticsearch client.
 
+    Responses are gzip-compressed (`http_compress`), and up to
+    CONNECTIONS_PER_NODE keep-alive connections are pooled per node.
+
     Args:
         host (str): The hostname for the Elasticsearch instance.
         port (int): The port for the Elasticsearch instance.
@@ -28,7 +41,12 @@ def create_elasticsearch_client(host, port):
         ElasticsearchConnectionError: If the connection to Elasticsearch fails.
     """
     try:
-        es_client = Elasticsearch(f"http://{host}:{port}")
+        es_client = Elasticsearch(
+            f"http://{host}:{port}",
+            http_compress=True,
+            request_timeout=REQUEST_TIMEOUT,
+            connections_per_node=CONNECTIONS_PER_NODE,
+        )
         # Perform a simple request to check if the connection is successful
         if not es_client.ping():
             raise ElasticsearchConnectionError("Could not connect to Elasticsearch")
@@ -204,6 +222,153 @@ def index_document(es_client, index_name, document, timeout=60, replace=True):
     return status
 
 
+def delete_indexed_documents(
+    es_client, index_name, documents, chunk_size=BULK_CHUNK_SIZE
+):
+    """
+    Remove indexed documents sharing an (id, chunk_id) pair with any of
+    `documents`, with one `_delete_by_query` request per `chunk_size` documents.
+
+    Args:
+        es_client (Elasticsearch): The Elasticsearch client instance.
+        index_name (str): The name of the index.
+        documents (list): The documents containing the id and chunk_id for deletion.
+        chunk_size (int, optional): The number of documents per request.
+                                    Default is BULK_CHUNK_SIZE.
+
+    Returns:
+        int: The number of documents deleted.
+    """
+    n_deleted = 0
+    for offset in range(0, len(documents), chunk_size):
+        response = es_client.delete_by_query(
+            index=index_name,
+            query={
+                "bool": {
+                    "should": [
+                        {
+                            "bool": {
+                                "must": [
+                                    {"term": {"id": document["id"]}},
+                                    {"term": {"chunk_id": document["chunk_id"]}},
+                                ]
+                            }
+                        }
+                        for document in documents[offset : offset + chunk_size]
+                    ],
+                    "minimum_should_match": 1,
+                }
+            },
+            conflicts="proceed",
+        )
+        n_deleted += response["deleted"]
+
+    return n_deleted
+
+
+def bulk_index_documents(
+    es_client,
+    index_name,
+    documents,
+    timeout=60,
+    replace=True,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=BULK_THREAD_COUNT,
+    verbose=True,
+):  # pylint: disable=too-many-arguments,too-many-locals
+    """
+    Index documents into an Elasticsearch index with `_bulk` requests of
+    `chunk_size` documents, sent by `thread_count` threads.
+
+    Documents rejected because the cluster is overloaded (HTTP 429, for the
+    document or its whole `_bulk` request) or whose request timed out are
+    resubmitted up to BULK_MAX_RETRIES times with exponential backoff;
+    other failures are reported and skipped, like in `index_document`.
+    With `replace`, copies left by a timed-out request are deleted before
+    resubmitting.
+
+    Args:
+        es_client (Elasticsearch): The Elasticsearch client instance.
+        index_name (str): The name of the index.
+        documents (list): The documents to index.
+        timeout (int, optional): The timeout for each bulk request in seconds.
+                                 Default is 60.
+        replace (bool, optional): Whether to replace existing documents with
+                                  the same id and chunk_id. Defaults to True.
+        chunk_size (int, optional): The number of documents per bulk request.
+                                    Default is BULK_CHUNK_SIZE.
+        thread_count (int, optional): The number of concurrent bulk requests.
+                                      Default is BULK_THREAD_COUNT.
+        verbose (bool, optional): Whether to show a progress bar. Default is True.
+
+    Returns:
+        dict: A status dictionary containing the number of documents removed and indexed.
+    """
+    status = {
+        "removed": 0,
+        "indexed": 0,
+    }
+
+    if replace:
+        try:
+            status["removed"] += delete_indexed_documents(
+                es_client, index_name, documents, chunk_size
+            )
+        except NotFoundError:
+            pass
+
+    pending = documents
+    with tqdm(total=len(documents), disable=not verbose) as progress:
+        for attempt in range(BULK_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(2**attempt)
+
+            rejected = []
+            results = parallel_bulk(
+                es_client.options(request_timeout=timeout),
+                ({"_index": index_name, "_source": document} for document in pending),
+                thread_count=thread_count,
+                chunk_size=chunk_size,
+                raise_on_error=False,
+                # Failed `_bulk` requests (e.g. 429) are reported per document
+                raise_on_exception=False,
+            )
+            processed = 0
+            try:
+                for document, (ok, info) in zip(pending, results):
+                    processed += 1
+                    if ok:
+                        status["indexed"] += 1
+                    elif info["index"]["status"] == 429 and attempt < BULK_MAX_RETRIES:
+                        rejected.append(document)
+                        continue
+                    else:
+                        print(
+                            info["index"].get("error"),
+                            "id:",
+                            document["id"],
+                            "-> Skipped...",
+                        )
+                    progress.update()
+            except ConnectionTimeout:
+                if attempt == BULK_MAX_RETRIES:
+                    raise
+                unconfirmed = pending[processed:]
+                if replace:
+                    # A timed-out request may still have been applied
+                    es_client.indices.refresh(index=index_name)
+                    delete_indexed_documents(
+                        es_client, index_name, unconfirmed, chunk_size
+                    )
+                rejected.extend(unconfirmed)
+
+            if not rejected:
+                break
+            pending = rejected
+
+    return status
+
+
 def get_index_mapping(es_client, index_name):
     """
     Retrieve and return the mapping for an Elasticsearch index.
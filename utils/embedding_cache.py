@@ -0,0 +1,128 @@
+"""
+This module provides a persistent embedding cache backed by SQLite, so
+embeddings survive process restarts. The utility functions are used to:
+    1. Look up cached embeddings by a SHA-256 key of (model, text).
+    2. Store new embeddings as compact float32 blobs.
+    3. Return a cached embedding, or compute and store it on a miss.
+    4. Do the same for several texts, computing all misses in one call.
+
+Connections are shared between threads (see `utils.sqlite_cache`).
+"""
+
+import hashlib
+
+import numpy as np
+
+from utils.sqlite_cache import LOCK, get_connection
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL
+)
+"""
+
+
+def embedding_key(model_name, text):
+    """
+    Compute the cache key of an embedding.
+
+    Args:
+        model_name (str): The name of the embedding model.
+        text (str): The embedded text.
+
+    Returns:
+        str: The hex SHA-256 digest of "model_name:text".
+    """
+    return hashlib.sha256(f"{model_name}:{text}".encode("utf-8")).hexdigest()
+
+
+def get_cached_embedding(cache_path, model_name, text):
+    """
+    Look up the embedding of `text` by `model_name`.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_name (str): The name of the embedding model.
+        text (str): The embedded text.
+
+    Returns:
+        list or None: The embedding as a list of floats, or None if not cached.
+    """
+    conn = get_connection(cache_path, CREATE_TABLE_SQL)
+    with LOCK:
+        row = conn.execute(
+            "SELECT vector FROM embeddings WHERE key = ?",
+            (embedding_key(model_name, text),),
+        ).fetchone()
+
+    if row is None:
+        return None
+    return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+
+def set_cached_embedding(cache_path, model_name, text, embedding):
+    """
+    Store the embedding of `text` by `model_name` as a float32 blob.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_name (str): The name of the embedding model.
+        text (str): The embedded text.
+        embedding (list or np.ndarray): The embedding vector.
+    """
+    conn = get_connection(cache_path, CREATE_TABLE_SQL)
+    with LOCK, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            (
+                embedding_key(model_name, text),
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+            ),
+        )
+
+
+def get_or_compute(cache_path, model_name, text, compute):
+    """
+    Return the cached embedding of `text`, computing and storing it on a miss.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_name (str): The name of the embedding model.
+        text (str): The text to embed.
+        compute (callable): Called with `text` to compute its embedding on a miss.
+
+    Returns:
+        list: The embedding as a list of floats.
+    """
+    embedding = get_cached_embedding(cache_path, model_name, text)
+    if embedding is None:
+        embedding = compute(text)
+        set_cached_embedding(cache_path, model_name, text, embedding)
+    return embedding
+
+
+def get_or_compute_many(cache_path, model_name, texts, compute_many):
+    """
+    Return the embeddings of `texts`, computing all cache misses in one call.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_name (str): The name of the embedding model.
+        texts (list of str): The texts to embed.
+        compute_many (callable): Called with the list of missed texts to compute
+                                 their embeddings (in order).
+
+    Returns:
+        list: The embeddings of `texts`, in order, as lists of floats.
+    """
+    embeddings = [get_cached_embedding(cache_path, model_name, text) for text in texts]
+    missed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+    if missed:
+        computed = compute_many([texts[i] for i in missed])
+        for i, embedding in zip(missed, computed):
+            embeddings[i] = embedding
+            set_cached_embedding(cache_path, model_name, texts[i], embedding)
+
+    return embeddings
@@ -38,13 +38,13 @@ def is_grafana_token_valid():
     response = requests.get(url=f"{GRAFANA_URL}/api/user", headers=headers, timeout=30)
 
     # Check if the token is valid
-    if response.status_code == 200:
+    if response.ok:
         user_info = response.json()
         print(f"Token is valid. user_info: {user_info}")
         return True
 
     print(f"Token is invalid. Status code: {response.status_code}")
-    print(response.json())
+    print(response.text[:500])
     return False
 
 
@@ -77,12 +77,12 @@ def create_grafana_token(seconds_to_live=0):
 
     # Check if the request was successful
     token = None
-    if response.status_code == 200:
+    if response.ok:
         token = response.json().get("key")
         print(f"API Key: {token}")
     else:
         print(f"Failed to create API key. Status code: {response.status_code}")
-        print(response.json())
+        print(response.text[:500])
 
     return token
 
@@ -107,7 +107,7 @@ def get_grafana_token_ids():
     # Check if the request was successful
     token_ids = []
 
-    if response.status_code == 200:
+    if response.ok:
         keys = response.json()
         if keys:
             print("Existing Grafana API Keys:")
@@ -118,7 +118,7 @@ def get_grafana_token_ids():
             print("No Grafana API keys found.")
     else:
         print(f"Failed to retrieve API keys. Status code: {response.status_code}")
-        print(response.json())
+        print(response.text[:500])
 
     return token_ids
 
@@ -141,11 +141,11 @@ def delete_grafana_token(token_id):
     )
 
     # Check if the request was successful
-    if response.status_code == 200:
+    if response.ok:
         print(f"API Key with ID {token_id} successfully deleted.")
     else:
         print(f"Failed to delete API key. Status code: {response.status_code}")
-        print(response.json())
+        print(response.text[:500])
 
 
 def get_grafana_data_source(datasource_name):
@@ -169,14 +169,15 @@ def get_grafana_data_source(datasource_name):
         timeout=30,
     )
 
-    if response.status_code == 200:
-        print(f"Found datasource {datasource_name} with uid {response.json()['uid']}")
-        return response.json()
+    if response.ok:
+        datasource = response.json()
+        print(f"Found datasource {datasource_name} with uid {datasource['uid']}")
+        return datasource
 
     print(
         "Failed to get datasource ID. Status code:",
         response.status_code,
-        f"Response: {response.text}",
+        f"Response: {response.text[:500]}",
     )
     return None
 
@@ -198,7 +199,7 @@ def drop_grafana_data_source(datasource_name):
         headers=headers,
         timeout=30,
     )
-    if response.status_code == 200:
+    if response.ok:
         datasource_id = response.json()["id"]
         # Delete the datasource by ID
         delete_response = requests.delete(
@@ -206,13 +207,13 @@ def drop_grafana_data_source(datasource_name):
             headers=headers,
             timeout=30,
         )
-        if delete_response.status_code == 200:
+        if delete_response.ok:
             print("Datasource deleted successfully.")
         else:
             print(
                 "Failed to delete datasource. Status code:",
                 delete_response.status_code,
-                f"Response: {delete_response.text}",
+                f"Response: {delete_response.text[:500]}",
             )
 
 
@@ -235,13 +236,13 @@ def create_grafana_data_source(datasource_info):
         data=json.dumps(datasource_info),
     )
 
-    if response.status_code == 200:
+    if response.ok:
         print("Datasource created successfully.")
     else:
         print(
             "Failed to create datasource. Status code:",
             response.status_code,
-            f"Response: {response.text}",
+            f"Response: {response.text[:500]}",
         )
 
 
@@ -265,13 +266,13 @@ def create_dashboard(dashboard):
         data=json.dumps(dashboard),
     )
 
-    if response.status_code == 200:
+    if response.ok:
         print("Dashboard created successfully.")
     else:
         print(
             "Failed to create dashboard. Status code:",
             response.status_code,
-            f"Response: {response.text}",
+            f"Response: {response.text[:500]}",
         )
 
 
@@ -294,7 +295,7 @@ def get_dashboard_uid_by_name(dashboard_name):
         timeout=30,
     )
 
-    if response.status_code == 200:
+    if response.ok:
         dashboards = response.json()
         for dashboard in dashboards:
             if dashboard.get("title") == dashboard_name:
@@ -304,7 +305,7 @@ def get_dashboard_uid_by_name(dashboard_name):
         print(
             "Failed to retrieve dashboards. Status code:",
             response.status_code,
-            f"Response: {response.text}",
+            f"Response: {response.text[:500]}",
         )
     return None
 
@@ -325,11 +326,11 @@ def delete_dashboard(dashboard_uid):
         timeout=30,
     )
 
-    if response.status_code == 200:
+    if response.ok:
         print(f"Dashboard {dashboard_uid} deleted successfully.")
     else:
         print(
             "Failed to delete dashboard. Status code:",
             response.status_code,
-            f"Response: {response.text}",
+            f"Response: {response.text[:500]}",
         )
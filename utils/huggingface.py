@@ -1,13 +1,17 @@
 """
-This module provides utility functions for working with Hugging Face models, 
-including functions to vectorize text and documents, normalize vectors to unit 
+This module provides utility functions for working with Hugging Face models,
+including functions to vectorize text and documents, normalize vectors to unit
 length, and embed documents by concatenating specified fields.
 """
 
+import base64
+
 import numpy as np
 
+from utils.utils import quantize_vector
+
 
-def vectorize_text(model, text, precision=10):
+def vectorize_text(model, text):
     """
     Vectorize a given text using a specified model and normalize
     the resulting vector to unit length.
@@ -16,17 +20,29 @@ def vectorize_text(model, text, precision=10):
         model: The model to use for encoding the text,
                typically a sentence or document embedding model.
         text (str): The text to be vectorized.
-        precision (int): The number of decimal places to which the vector
-                         components should be rounded. Default is 10.
 
     Returns:
-        list: A list representing the normalized vector (unit length) of the
-              encoded text, rounded to the specified precision.
+        numpy.ndarray: The normalized (unit length) float32 vector of the
+                       encoded text.
+    """
+    return model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+def encode_int8_vector(vec):
     """
-    vec = model.encode(text)
-    vec = vec / np.linalg.norm(vec).tolist()
+    Quantize a unit-length vector to int8 and encode its bytes as base64.
+
+    The scale is fixed at 1/127 for all vectors, so the original vector is
+    recovered with `dequantize_vector(np.frombuffer(base64.b64decode(s), np.int8))`.
+
+    Args:
+        vec (numpy.ndarray): The unit-length vector to encode.
 
-    return [round(d, precision) for d in vec]
+    Returns:
+        str: The base64-encoded int8 vector.
+    """
+    quantized, _ = quantize_vector(vec, scale=1 / 127)
+    return base64.b64encode(quantized.tobytes()).decode("ascii")
 
 
 def vectorize_document(
@@ -34,7 +50,7 @@ def vectorize_document(
     document,
     keys=None,
     vector_key="text_vector",
-    precision=10,
+    quantize=False,
 ):
     """
     Embed a document by concatenating specified fields and vectorizing
@@ -47,18 +63,65 @@ def vectorize_document(
                                for embedding. Default is ["title", "text", "question"].
         vector_key (str, optional): The key under which the embedding vector
                                     is stored. Default is 'text_vector'.
-        precision (int, optional): The number of decimal places to which the
-                                   vector components should be rounded. Default is 10.
+        quantize (bool, optional): Whether to also store the int8-quantized vector
+                                   (base64) under `<vector_key>_int8`. Default is False.
 
     Returns:
-        dict: The original document with an added embedding vector for the
-              concatenated fields specified by `keys`.
+        dict: The original document with an added float32 embedding vector for
+              the concatenated fields specified by `keys`.
     """
     if not keys:
         keys = ["title", "text", "question"]
 
-    text = "\n".join([document.get(key, "") for key in keys])
+    text = "\n".join(document.get(key, "") for key in keys)
 
-    document[vector_key] = vectorize_text(model=model, text=text, precision=precision)
+    document[vector_key] = vectorize_text(model=model, text=text)
+
+    if quantize:
+        document[f"{vector_key}_int8"] = encode_int8_vector(document[vector_key])
 
     return document
+
+
+def vectorize_documents(
+    model,
+    documents,
+    keys=None,
+    vector_key="text_vector",
+    batch_size=32,
+    quantize=False,
+):  # pylint: disable=too-many-arguments
+    """
+    Embed a list of documents in place, encoding all texts in batches
+    instead of one model call per document.
+
+    Args:
+        model: The model to use for generating embeddings.
+        documents (list): A list of dictionaries containing fields specified in `keys`.
+        keys (list, optional): A list of keys in each document to concatenate
+                               for embedding. Default is ["title", "text", "question"].
+        vector_key (str, optional): The key under which the embedding vector
+                                    is stored. Default is 'text_vector'.
+        batch_size (int, optional): The number of texts encoded per forward pass.
+                                    Default is 32.
+        quantize (bool, optional): Whether to also store the int8-quantized vector
+                                   (base64) under `<vector_key>_int8`. Default is False.
+
+    Returns:
+        list: The same `documents` list, each document updated with its
+              float32 embedding vector under `vector_key`.
+    """
+    if not keys:
+        keys = ["title", "text", "question"]
+
+    texts = ["\n".join(document.get(key, "") for key in keys) for document in documents]
+    vecs = model.encode(texts, batch_size=batch_size, normalize_embeddings=True).astype(
+        np.float32
+    )
+
+    for document, vec in zip(documents, vecs):
+        document[vector_key] = vec
+        if quantize:
+            document[f"{vector_key}_int8"] = encode_int8_vector(vec)
+
+    return documents
@@ -0,0 +1,91 @@
+"""
+This module provides a persistent cache of LLM responses backed by SQLite.
+The utility functions are used to:
+    1. Look up a cached response by a SHA-256 key of (model, prompt,
+       completion arguments).
+    2. Store new responses.
+
+Connections are shared between threads (see `utils.sqlite_cache`).
+"""
+
+import hashlib
+import json
+
+from utils.sqlite_cache import LOCK, get_connection
+
+# Part of every key; bump it when the key layout or what gets cached changes,
+# so older entries miss
+KEY_VERSION = 3
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    answer TEXT NOT NULL
+)
+"""
+
+
+def response_key(model_choice, prompt, completion_kwargs=None):
+    """
+    Compute the cache key of an LLM response.
+
+    Args:
+        model_choice (str): The model used for generating the response.
+        prompt (str): The prompt passed to the model.
+        completion_kwargs (dict, optional): The arguments of the completion
+            request that shape the response (e.g. `response_format`,
+            `temperature`). Default is None, for no arguments.
+
+    Returns:
+        str: The hex SHA-256 digest of the key version, model, prompt and the
+             canonical JSON of the completion arguments.
+    """
+    kwargs = json.dumps(completion_kwargs or {}, sort_keys=True)
+    key = f"v{KEY_VERSION}\x00{model_choice}\x00{prompt}\x00{kwargs}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(cache_path, model_choice, prompt, completion_kwargs=None):
+    """
+    Look up the response of `model_choice` to `prompt`.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_choice (str): The model used for generating the response.
+        prompt (str): The prompt passed to the model.
+        completion_kwargs (dict, optional): The completion request arguments
+                                            (see `response_key`).
+
+    Returns:
+        str or None: The cached response, or None if not cached.
+    """
+    conn = get_connection(cache_path, CREATE_TABLE_SQL)
+    with LOCK:
+        row = conn.execute(
+            "SELECT answer FROM responses WHERE key = ?",
+            (response_key(model_choice, prompt, completion_kwargs),),
+        ).fetchone()
+
+    return None if row is None else row[0]
+
+
+def set_cached_response(
+    cache_path, model_choice, prompt, answer, completion_kwargs=None
+):
+    """
+    Store the response of `model_choice` to `prompt`.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        model_choice (str): The model used for generating the response.
+        prompt (str): The prompt passed to the model.
+        answer (str): The model's response.
+        completion_kwargs (dict, optional): The completion request arguments
+                                            (see `response_key`).
+    """
+    conn = get_connection(cache_path, CREATE_TABLE_SQL)
+    with LOCK, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, answer) VALUES (?, ?)",
+            (response_key(model_choice, prompt, completion_kwargs), answer),
+        )
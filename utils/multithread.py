@@ -1,15 +1,17 @@
 """
 This module provides a utility function for mapping a function
 over a sequence with progress tracking using ThreadPoolExecutor
-and tqdm for progress visualization.
+(or ProcessPoolExecutor for CPU-bound work) and tqdm for progress
+visualization.
 """
 
-from concurrent.futures import ThreadPoolExecutor
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from tqdm.auto import tqdm
 
 
-def map_progress(f, seq, max_workers=1, verbose=True):
+def map_progress(f, seq, max_workers="auto", verbose=True, processes=False):
     """
     Map a function over a sequence with progress tracking.
 
@@ -17,29 +19,40 @@ def map_progress(f, seq, max_workers=1, verbose=True):
         f (callable): The function to apply to each element in the
             sequence.
         seq (iterable): The sequence of elements to process.
-        max_workers (int, optional): The maximum number of threads
-            to use. Default is 1.
-        verbose (bool): Whether to log progress
+        max_workers (int or str, optional): The maximum number of threads
+            (or processes) to use. Default is "auto", which picks
+            min(32, cpu_count * 8) threads, suited to I/O-bound work
+            (HTTP calls, disk reads), or cpu_count processes.
+        verbose (bool): Whether to log the number of processed items
+            once done; per-item progress is shown by tqdm.
+        processes (bool, optional): Whether to run `f` in worker processes
+            instead of threads, for pure-Python CPU-bound work that holds
+            the GIL. `f` and the elements must then be picklable (no
+            lambdas; use functools.partial). Default is False.
 
     Returns:
         list: A list of results from applying the function to each
-        element in the sequence.
+        element in the sequence, in the order of `seq`.
     """
-    pool = ThreadPoolExecutor(max_workers=max_workers)
+    if max_workers in (None, "auto"):
+        cpu_count = os.cpu_count() or 1
+        max_workers = cpu_count if processes else min(32, cpu_count * 8)
 
-    results = []
     seq_len = len(seq)
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
 
-    with tqdm(total=seq_len) as progress:
-        for i, el in enumerate(seq):
+    with executor_class(max_workers=max_workers) as pool, tqdm(
+        total=seq_len
+    ) as progress:
+        futures = []
+        for el in seq:
             future = pool.submit(f, el)
             future.add_done_callback(lambda p: progress.update())
-            results.append(future.result())
+            futures.append(future)
 
-            if (i % (max(seq_len, 20) // 20) == 0) and verbose:
-                print(f"{len(results)}/{seq_len} items processed so far...")
+        results = [future.result() for future in futures]
 
-        if verbose:
-            print(f"{len(results)}/{seq_len} items processed.")
+    if verbose:
+        print(f"{len(results)}/{seq_len} items processed.")
 
     return results
@@ -3,19 +3,34 @@ This module provides utility functions for working with Ollama's embedding API.
 The utility functions are used to:
     1. Embed a document using a specified model (must be available in Ollama).
     2. Embed a batch of documents containing 'questions' and 'text' keys.
-    3. Additional functions to interact with Ollama models.
+    3. Embed documents concurrently with an async client.
+    4. Additional functions to interact with Ollama models.
 
 The functions simplify embedding operations and ensure that the embedding
 results can be directly used for further analysis or search tasks.
 """
 
-from openai import OpenAI
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import numpy as np
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
+from utils.openai import HTTP_LIMITS
+
+MAX_EMBED_BATCH_SIZE = 256
+EMBEDDING_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=8)
 def create_ollama_client(ollama_host, ollama_port):
     """
     Create and return an Ollama client configured with the given host and port.
 
+    Clients are cached per (host, port) so their connection pool is reused
+    across calls; callers must not mutate the returned client.
+
     Args:
         ollama_host (str): The hostname of the Ollama server.
         ollama_port (int): The port number for the Ollama server.
@@ -26,6 +41,28 @@ def create_ollama_client(ollama_host, ollama_port):
     return OpenAI(
         base_url=f"http://{ollama_host}:{ollama_port}/v1/",
         api_key="ollama",
+        http_client=DefaultHttpxClient(limits=HTTP_LIMITS),
+    )
+
+
+def create_async_ollama_client(ollama_host, ollama_port):
+    """
+    Create and return an async Ollama client configured with the given host and port.
+
+    Unlike `create_ollama_client`, this isn't cached: an async client's
+    connection pool is bound to the event loop it was first used in.
+
+    Args:
+        ollama_host (str): The hostname of the Ollama server.
+        ollama_port (int): The port number for the Ollama server.
+
+    Returns:
+        AsyncOpenAI: An instance of the async OpenAI client configured for Ollama.
+    """
+    return AsyncOpenAI(
+        base_url=f"http://{ollama_host}:{ollama_port}/v1/",
+        api_key="ollama",
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS),
     )
 
 
@@ -41,11 +78,55 @@ def get_embedding(client, text, model_name="nomic-embed-text"):
 
     Returns:
         list: The embedding of the text as a list of floats.
+
+    Notes:
+        Whitespace runs are collapsed into single spaces, and results are
+        cached per (client, text, model_name), so repeated texts (titles,
+        recurring questions) are only embedded once per process. The cache
+        is meant for such short texts; documents, embedded once each, go
+        through `embed_document` instead, which bypasses it.
+    """
+    return list(_get_embedding_cached(client, _normalize_text(text), model_name))
+
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _get_embedding_cached(client, text, model_name):
+    """
+    Embed a single text, caching the result as an immutable tuple so callers
+    can't alter the cached vector.
+    """
+    return tuple(_embed_text(client, text, model_name))
+
+
+def _embed_text(client, text, model_name):
+    """
+    Embed a single text with one request, without caching.
     """
-    text = text.replace("\n", " ")
     return client.embeddings.create(input=[text], model=model_name).data[0].embedding
 
 
+def get_embeddings(client, texts, model_name="nomic-embed-text"):
+    """
+    Get the embeddings for a list of texts in a single request.
+
+    Args:
+        client: The client instance to use for generating embeddings.
+        texts (list of str): The texts to be embedded.
+        model_name (str, optional): The name of the model to use for embedding.
+                                    Default is 'nomic-embed-text'.
+
+    Returns:
+        list: The embeddings of the texts, in the same order, as lists of floats.
+
+    Notes:
+        Texts are normalized like in `get_embedding`, so a text gets the same
+        embedding whichever of the two embedded it.
+    """
+    texts = [_normalize_text(text) for text in texts]
+    response = client.embeddings.create(input=texts, model=model_name)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
 def embed_document(
     client,
     document,
@@ -67,16 +148,187 @@ def embed_document(
                                     Default is 'nomic-embed-text'.
 
     Returns:
-        dict: The original document with an added embedding vector for the
-              concatenated fields specified by `keys`.
+        dict: The original document with an added float32 embedding vector for
+              the concatenated fields specified by `keys`.
     """
     if not keys:
         keys = ["title", "text", "question"]
 
-    text = "\n".join([document.get(key, "") for key in keys])
+    text = _normalize_text("\n".join(document.get(key, "") for key in keys))
 
-    document[vector_key] = get_embedding(
-        client=client, text=text, model_name=model_name
+    document[vector_key] = np.asarray(
+        _embed_text(client, text, model_name), dtype=np.float32
     )
 
     return document
+
+
+def embed_documents_batch(
+    client,
+    documents,
+    keys=None,
+    vector_key="text_vector",
+    model_name="nomic-embed-text",
+    batch_size=64,
+):  # pylint: disable=too-many-arguments
+    """
+    Embed a list of documents in place, sending `batch_size` texts per request
+    instead of one request per document. The texts of the next batch are
+    prepared in a background thread while the current request is in flight.
+
+    Args:
+        client: The client instance to use for generating embeddings.
+        documents (list): A list of dictionaries containing fields specified in `keys`.
+        keys (list, optional): A list of keys in each document to concatenate for
+                               embedding. Default is ["title", "text", "question"].
+        vector_key (str, optional): The key under which the embedding vector is stored.
+                                    Default is 'text_vector'.
+        model_name (str, optional): The name of the model to use for embedding.
+                                    Default is 'nomic-embed-text'.
+        batch_size (int, optional): The number of texts per request, capped at
+                                    MAX_EMBED_BATCH_SIZE. Default is 64.
+
+    Returns:
+        list: The same `documents` list, each document updated with its float32
+              embedding vector under `vector_key`.
+    """
+    if not keys:
+        keys = ["title", "text", "question"]
+
+    batch_size = max(1, min(batch_size, MAX_EMBED_BATCH_SIZE))
+    batches = [
+        documents[offset : offset + batch_size]
+        for offset in range(0, len(documents), batch_size)
+    ]
+    if not batches:
+        return documents
+
+    # Prepare the next batch's texts while the current request is in flight.
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        next_texts = prefetcher.submit(_prepare_texts, batches[0], keys)
+
+        for i, batch in enumerate(batches):
+            texts = next_texts.result()
+            if i + 1 < len(batches):
+                next_texts = prefetcher.submit(_prepare_texts, batches[i + 1], keys)
+
+            embeddings = get_embeddings(
+                client=client, texts=texts, model_name=model_name
+            )
+
+            for document, embedding in zip(batch, embeddings):
+                document[vector_key] = np.asarray(embedding, dtype=np.float32)
+
+    return documents
+
+
+def _prepare_texts(documents, keys):
+    """
+    Concatenate the `keys` fields of each document into a single-line text.
+    """
+    return [
+        _normalize_text("\n".join(document.get(key, "") for key in keys))
+        for document in documents
+    ]
+
+
+def _normalize_text(text):
+    """
+    Collapse whitespace runs (including newlines) into single spaces, so
+    every embedding path embeds the same text for the same input.
+    """
+    return " ".join(text.split())
+
+
+async def aembed_document(
+    client,
+    document,
+    semaphore,
+    keys=None,
+    vector_key="text_vector",
+    model_name="nomic-embed-text",
+):  # pylint: disable=too-many-arguments
+    """
+    Asynchronously embed a document, waiting on `semaphore` before sending
+    the request.
+
+    Args:
+        client (AsyncOpenAI): The async client instance to use for generating embeddings.
+        document (dict): A dictionary containing fields specified in `keys`.
+        semaphore (asyncio.Semaphore): Bounds the number of in-flight requests.
+        keys (list, optional): A list of keys in the document to concatenate for embedding.
+                               Default is ["title", "text", "question"].
+        vector_key (str, optional): The key under which the embedding vector is stored.
+                                    Default is 'text_vector'.
+        model_name (str, optional): The name of the model to use for embedding.
+                                    Default is 'nomic-embed-text'.
+
+    Returns:
+        dict: The original document with an added float32 embedding vector.
+    """
+    if not keys:
+        keys = ["title", "text", "question"]
+
+    text = _normalize_text("\n".join(document.get(key, "") for key in keys))
+
+    async with semaphore:
+        response = await client.embeddings.create(input=[text], model=model_name)
+
+    document[vector_key] = np.asarray(response.data[0].embedding, dtype=np.float32)
+
+    return document
+
+
+async def aembed_all(client, documents, concurrency=32, **embed_kwargs):
+    """
+    Asynchronously embed all documents with at most `concurrency` requests in flight.
+
+    Ollama queues requests beyond its parallel worker count, so `concurrency`
+    should be close to the server's OLLAMA_NUM_PARALLEL.
+
+    Args:
+        client (AsyncOpenAI): The async client instance to use for generating embeddings.
+        documents (list): A list of dictionaries to embed in place.
+        concurrency (int, optional): The maximum number of in-flight requests.
+                                     Default is 32.
+        **embed_kwargs: Additional arguments passed to `aembed_document`
+                        (keys, vector_key, model_name).
+
+    Returns:
+        list: The same `documents` list with embedding vectors added.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    await asyncio.gather(
+        *[
+            aembed_document(client, document, semaphore, **embed_kwargs)
+            for document in documents
+        ]
+    )
+    return documents
+
+
+def embed_all(ollama_host, ollama_port, documents, concurrency=32, **embed_kwargs):
+    """
+    Synchronous wrapper around `aembed_all`.
+
+    The async client is created and closed inside the event loop started here,
+    since its connection pool can't be shared across event loops.
+
+    Args:
+        ollama_host (str): The hostname of the Ollama server.
+        ollama_port (int): The port number for the Ollama server.
+        documents (list): A list of dictionaries to embed in place.
+        concurrency (int, optional): The maximum number of in-flight requests.
+                                     Default is 32.
+        **embed_kwargs: Additional arguments passed to `aembed_document`
+                        (keys, vector_key, model_name).
+
+    Returns:
+        list: The same `documents` list with embedding vectors added.
+    """
+
+    async def _run():
+        async with create_async_ollama_client(ollama_host, ollama_port) as client:
+            return await aembed_all(client, documents, concurrency, **embed_kwargs)
+
+    return asyncio.run(_run())
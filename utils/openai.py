@@ -1,15 +1,23 @@
 """
 This module provides utility functions for interacting with the OpenAI API.
 The main functionality includes:
-    1. Creating an OpenAI client using a provided API key or an environment variable.
+    1. Creating an OpenAI client (sync or async) using a provided API key or an
+       environment variable.
     2. Handling JSON responses from the OpenAI API.
 
 These utilities streamline the process of setting up and using OpenAI's services.
 """
 
 import os
+from functools import lru_cache
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Connection pool limits shared by the OpenAI and Ollama clients
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=32, keepalive_expiry=30
+)
 
 
 def create_openai_client(api_key=None):
@@ -22,8 +30,40 @@ def create_openai_client(api_key=None):
                                  retrieve it from the 'OPENAI_API_KEY' environment variable.
 
     Returns:
-        OpenAI: An instance of the OpenAI client.
+        OpenAI: An instance of the OpenAI client, shared between callers using
+                the same API key; callers must not mutate it.
+    """
+    if not api_key:
+        api_key = os.getenv("OPENAI_API_KEY")
+    return _create_openai_client(api_key)
+
+
+@lru_cache(maxsize=8)
+def _create_openai_client(api_key):
+    """
+    Create an OpenAI client, cached on the resolved API key so the
+    underlying connection pool is reused across calls.
+    """
+    return OpenAI(api_key=api_key, http_client=DefaultHttpxClient(limits=HTTP_LIMITS))
+
+
+def create_async_openai_client(api_key=None):
+    """
+    Create and return an async OpenAI client.
+
+    Unlike `create_openai_client`, this isn't cached: an async client's
+    connection pool is bound to the event loop it was first used in.
+
+    Args:
+        api_key (str, optional): The API key for authenticating with OpenAI.
+                                 If not provided, the function attempts to
+                                 retrieve it from the 'OPENAI_API_KEY' environment variable.
+
+    Returns:
+        AsyncOpenAI: An instance of the async OpenAI client.
     """
     if not api_key:
         api_key = os.getenv("OPENAI_API_KEY")
-    return OpenAI(api_key=api_key)
+    return AsyncOpenAI(
+        api_key=api_key, http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS)
+    )
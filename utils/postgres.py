@@ -1,24 +1,33 @@
 """
 This module provides utility functions for managing PostgreSQL operations.
 The utilities include functions to:
-    1. Connect to the PostgreSQL database.
+    1. Connect to the PostgreSQL database, either one-shot or through a
+       shared connection pool.
     2. Check the existence of databases and tables.
     3. Create, drop, and initialize databases and tables.
-    4. Save conversations and feedback data.
+    4. Save conversations and feedback data, one record at a time or in bulk;
+       single conversations are written in batches by a background thread.
     5. Retrieve recent conversations and feedback statistics.
 
 These utilities streamline database operations and make it easier to handle
 PostgreSQL interactions in applications.
 """
 
-import os
+import atexit
+import queue
+import time
 from datetime import datetime
+from threading import Lock, Thread
 from zoneinfo import ZoneInfo
 
 import psycopg
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
 from psycopg.errors import DatabaseError, OperationalError
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
 
+from utils.utils import print_log
 from utils.variables import (
     POSTGRES_DB,
     POSTGRES_HOST,
@@ -29,6 +38,62 @@ from utils.variables import (
 
 TZ = ZoneInfo("Africa/Cairo")
 
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+
+CONVERSATION_COLUMNS = (
+    "id",
+    "question_id",
+    "question",
+    "answer",
+    "model_used",
+    "response_time",
+    "relevance",
+    "relevance_explanation",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "eval_prompt_tokens",
+    "eval_completion_tokens",
+    "eval_total_tokens",
+    "openai_cost",
+    "timestamp",
+)
+
+INSERT_CONVERSATION_SQL = f"""
+    INSERT INTO conversations ({", ".join(CONVERSATION_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(CONVERSATION_COLUMNS))})
+""".strip()
+
+RECENT_CONVERSATIONS_ITERSIZE = 1000
+
+WRITE_QUEUE_SIZE = 1000
+WRITE_BATCH_SIZE = 64
+WRITE_MAX_RETRIES = 3
+WRITE_RETRY_DELAY = 0.5
+WRITE_CONNECT_TIMEOUT = 5
+FLUSH_TIMEOUT = 10
+FLUSH_POLL_INTERVAL = 0.05
+
+# Resolved once at import: `_SERVER_CONN_INFO` for server-level work
+# (creating/dropping the database), `_DB_CONN_INFO` for the app database.
+_SERVER_CONN_INFO = {
+    "postgres_host": POSTGRES_HOST,
+    "postgres_user": POSTGRES_USER,
+    "postgres_password": POSTGRES_PASSWORD,
+    "postgres_port": POSTGRES_PORT,
+}
+_DB_CONN_INFO = {**_SERVER_CONN_INFO, "postgres_db": POSTGRES_DB}
+
+_POOLS = {}
+_POOLS_LOCK = Lock()
+
+_CONVERSATION_QUEUE = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+_CONVERSATION_WRITER = None
+_CONVERSATION_WRITER_LOCK = Lock()
+# Errors of conversations the writer failed to save, by (id, question_id)
+_FAILED_CONVERSATIONS = {}
+
 CREATE_STATEMENTS = {
     "conversations": """
         CREATE TABLE conversations (
@@ -62,8 +127,45 @@ CREATE_STATEMENTS = {
                 REFERENCES conversations(id, question_id)
         )
     """.strip(),
+    "feedback_stats": """
+        CREATE TABLE feedback_stats (
+            thumbs_up BIGINT NOT NULL DEFAULT 0,
+            thumbs_down BIGINT NOT NULL DEFAULT 0
+        );
+
+        INSERT INTO feedback_stats (thumbs_up, thumbs_down)
+        SELECT
+            COUNT(*) FILTER (WHERE feedback > 0),
+            COUNT(*) FILTER (WHERE feedback < 0)
+        FROM feedback;
+
+        CREATE OR REPLACE FUNCTION update_feedback_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE feedback_stats SET
+                thumbs_up = thumbs_up + (NEW.feedback > 0)::INTEGER,
+                thumbs_down = thumbs_down + (NEW.feedback < 0)::INTEGER;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER feedback_stats_update
+        AFTER INSERT ON feedback
+        FOR EACH ROW EXECUTE FUNCTION update_feedback_stats();
+    """.strip(),
 }
 
+INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS conv_ts_idx ON conversations (timestamp DESC);",
+    """
+        CREATE INDEX IF NOT EXISTS conv_rel_ts_idx
+        ON conversations (relevance, timestamp DESC);
+    """.strip(),
+    """
+        CREATE INDEX IF NOT EXISTS fb_conv_idx
+        ON feedback (conversation_id, question_id);
+    """.strip(),
+]
+
 
 def get_db_connection(autocommit=True, **conn_info):
     """
@@ -86,6 +188,59 @@ def get_db_connection(autocommit=True, **conn_info):
     )
 
 
+def _get_pool(**conn_info):
+    """
+    Return the connection pool for the given connection details, creating
+    it on first use.
+
+    Args:
+        **conn_info: Connection details including host, dbname, user, password, and port.
+
+    Returns:
+        psycopg_pool.ConnectionPool: A pool of autocommit connections.
+    """
+    conninfo = make_conninfo(
+        host=conn_info.get("postgres_host"),
+        dbname=conn_info.get("postgres_db"),
+        user=conn_info.get("postgres_user"),
+        password=conn_info.get("postgres_password"),
+        port=conn_info.get("postgres_port"),
+    )
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(conninfo)
+        if pool is None:
+            pool = ConnectionPool(
+                conninfo=conninfo,
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                kwargs={"autocommit": True},
+                open=True,
+            )
+            _POOLS[conninfo] = pool
+
+    return pool
+
+
+def get_pooled_connection(timeout=None, **conn_info):
+    """
+    Borrow a connection from the pool for the given connection details.
+
+    Must be used as a context manager; the connection is returned to the
+    pool on exit instead of being closed. Use `get_db_connection` for
+    administrative work (creating or dropping databases).
+
+    Args:
+        timeout (float, optional): Seconds to wait for a connection before
+            raising `psycopg_pool.PoolTimeout`. Defaults to the pool's timeout.
+        **conn_info: Connection details including host, dbname, user, password, and port.
+
+    Returns:
+        contextmanager: Yields a psycopg.Connection with autocommit enabled.
+    """
+    return _get_pool(**conn_info).connection(timeout=timeout)
+
+
 def check_database_exists(conn, db_name):
     """
     Check if a specified PostgreSQL database exists.
@@ -97,42 +252,40 @@ def check_database_exists(conn, db_name):
     Returns:
         bool: True if the database exists, otherwise False.
     """
-    query = f"""
+    query = """
     SELECT EXISTS (
-        SELECT 1 FROM pg_database WHERE datname='{db_name}'
+        SELECT 1 FROM pg_database WHERE datname = %s
     );
     """.strip()
 
-    res = conn.execute(query)
+    res = conn.execute(query, (db_name,))
     db_exists = res.fetchall()[0][0]
 
     return db_exists
 
 
-def check_table_exists(conn, table_name):
+def check_tables_exist(conn, table_names):
     """
-    Check if a specified table exists in the current PostgreSQL database.
+    Check which of the specified tables exist in the current PostgreSQL database,
+    using a single query.
 
     Args:
         conn (psycopg.Connection): The connection to the PostgreSQL database.
-        table_name (str): The name of the table to check.
+        table_names (iterable of str): The names of the tables to check.
 
     Returns:
-        bool: True if the table exists, otherwise False.
+        set of str: The names among `table_names` that exist.
     """
-    query = f"""
-    SELECT EXISTS (
-        SELECT 1 
-        FROM information_schema.tables 
-        WHERE table_schema = 'public' 
-        AND table_name = '{table_name}'
-    );
+    query = """
+    SELECT table_name
+    FROM information_schema.tables 
+    WHERE table_schema = 'public' 
+    AND table_name = ANY(%s);
     """
 
-    res = conn.execute(query)
-    table_exists = res.fetchall()[0][0]
+    res = conn.execute(query, (list(table_names),))
 
-    return bool(table_exists)
+    return {row[0] for row in res.fetchall()}
 
 
 def drop_db(conn, db_name):
@@ -146,16 +299,17 @@ def drop_db(conn, db_name):
     with conn.cursor() as cur:
         # Terminate all connections to the target database
         cur.execute(
-            f"""
+            """
             SELECT pg_terminate_backend(pg_stat_activity.pid)
             FROM pg_stat_activity
-            WHERE pg_stat_activity.datname = '{db_name}'
+            WHERE pg_stat_activity.datname = %s
                 AND pid <> pg_backend_pid();
-        """
+        """,
+            (db_name,),
         )
         # Drop the target database
         try:
-            cur.execute(f"DROP DATABASE {db_name};")
+            cur.execute(sql.SQL("DROP DATABASE {};").format(sql.Identifier(db_name)))
             print(f"Database {db_name} dropped successfully.")
         except (DatabaseError, OperationalError):
             print(f"Database {db_name} doesn't exist!")
@@ -163,21 +317,15 @@ def drop_db(conn, db_name):
 
 def init_db(reinit_db=False):
     """
-    Initialize the PostgreSQL database and create required tables.
+    Initialize the PostgreSQL database and create required tables and indexes.
 
     Args:
         reinit_db (bool, optional): Whether to recreate the database. Defaults to False.
     """
-    conn_info = {
-        "postgres_host": POSTGRES_HOST,
-        "postgres_user": POSTGRES_USER,
-        "postgres_password": POSTGRES_PASSWORD,
-        "postgres_port": POSTGRES_PORT,
-    }
     postgres_db = POSTGRES_DB
 
     ## =====> Database
-    with get_db_connection(**conn_info) as conn:
+    with get_db_connection(**_SERVER_CONN_INFO) as conn:
         if reinit_db:
             print("Recreating Postgres DB {postgres_db}...")
             drop_db(conn, postgres_db)
@@ -185,25 +333,35 @@ def init_db(reinit_db=False):
         if check_database_exists(conn, postgres_db):
             print(f"Database {postgres_db} already exists")
         else:
-            conn.execute(f"create database {postgres_db};")
+            conn.execute(
+                sql.SQL("create database {};").format(sql.Identifier(postgres_db))
+            )
             print(f"Successfully created database {postgres_db}")
 
     ## =====> Tables
-    conn_info["postgres_db"] = postgres_db
-    with get_db_connection(**conn_info) as conn:
-        for table_name in ["conversations", "feedback"]:
-            if check_table_exists(conn, table_name):
+    with get_db_connection(**_DB_CONN_INFO) as conn:
+        existing_tables = check_tables_exist(conn, CREATE_STATEMENTS)
+        for table_name, statement in CREATE_STATEMENTS.items():
+            if table_name in existing_tables:
                 print(f"Table {table_name} already exists")
             else:
-                conn.execute(CREATE_STATEMENTS[table_name])
+                conn.execute(statement)
                 print(f"Successfully created table {table_name}")
 
+        ## =====> Indexes (idempotent, also applied to existing tables)
+        for statement in INDEX_STATEMENTS:
+            conn.execute(statement)
+
 
 def save_conversation(
     conversation_id, question_id, question, answer_data, timestamp=None
 ):
     """
-    Save a conversation record to the database.
+    Queue a conversation record to be saved to the database.
+
+    Records are written in batches by a background thread, so this returns
+    as soon as the record is queued (blocking only while the queue is full).
+    Call `flush_conversations` to wait until queued records are written.
 
     Args:
         conversation_id (str): The ID of the conversation.
@@ -212,54 +370,193 @@ def save_conversation(
         answer_data (dict): A dictionary containing the answer and related metadata.
         timestamp (datetime, optional): The timestamp for the record. Defaults to the current time.
     """
-    if timestamp is None:
-        timestamp = datetime.now(TZ)
+    _start_conversation_writer()
+    _CONVERSATION_QUEUE.put(
+        _conversation_row(
+            conversation_id, question_id, question, answer_data, timestamp
+        )
+    )
 
-    conn_info = {
-        "postgres_host": POSTGRES_HOST,
-        "postgres_user": POSTGRES_USER,
-        "postgres_password": POSTGRES_PASSWORD,
-        "postgres_port": POSTGRES_PORT,
-        "postgres_db": POSTGRES_DB,
-    }
 
-    with get_db_connection(**conn_info) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO conversations 
-                (id, question_id, question, answer, model_used, response_time, relevance, 
-                relevance_explanation, prompt_tokens, completion_tokens, total_tokens, 
-                eval_prompt_tokens, eval_completion_tokens, eval_total_tokens, 
-                openai_cost, timestamp)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                COALESCE(%s, CURRENT_TIMESTAMP))
-            """,
-                (
-                    conversation_id,
-                    question_id,
-                    question,
-                    answer_data["answer"],
-                    answer_data["model_used"],
-                    answer_data["response_time"],
-                    answer_data["relevance"],
-                    answer_data["relevance_explanation"],
-                    answer_data["prompt_tokens"],
-                    answer_data["completion_tokens"],
-                    answer_data["total_tokens"],
-                    answer_data["eval_prompt_tokens"],
-                    answer_data["eval_completion_tokens"],
-                    answer_data["eval_total_tokens"],
-                    answer_data["openai_cost"],
-                    timestamp,
-                ),
+@atexit.register
+def flush_conversations(timeout=FLUSH_TIMEOUT):
+    """
+    Wait until every queued conversation record has been written, for at
+    most `timeout` seconds. Returns right away if the writer thread isn't
+    running, since nothing would drain the queue.
+    Registered with `atexit` so queued records aren't lost at shutdown.
+
+    Args:
+        timeout (float, optional): The maximum time to wait in seconds.
+                                   Default is FLUSH_TIMEOUT.
+
+    Returns:
+        bool: True if the queue was drained, otherwise False.
+    """
+    deadline = time.monotonic() + timeout
+    while _CONVERSATION_QUEUE.unfinished_tasks:
+        writer = _CONVERSATION_WRITER
+        if writer is None or not writer.is_alive() or time.monotonic() >= deadline:
+            return False
+        time.sleep(FLUSH_POLL_INTERVAL)
+
+    return True
+
+
+def _start_conversation_writer():
+    """
+    Start the background conversation writer thread if it isn't running.
+    """
+    global _CONVERSATION_WRITER  # pylint: disable=global-statement
+
+    with _CONVERSATION_WRITER_LOCK:
+        if _CONVERSATION_WRITER is None or not _CONVERSATION_WRITER.is_alive():
+            _CONVERSATION_WRITER = Thread(
+                target=_write_queued_conversations,
+                name="conversation-writer",
+                daemon=True,
             )
+            _CONVERSATION_WRITER.start()
+
+
+def _write_queued_conversations():
+    """
+    Drain the conversation queue forever, writing up to `WRITE_BATCH_SIZE`
+    rows at a time with `_insert_conversations`.
+    """
+    while True:
+        rows = [_CONVERSATION_QUEUE.get()]
+        while len(rows) < WRITE_BATCH_SIZE:
+            try:
+                rows.append(_CONVERSATION_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            _insert_conversations(rows)
+        finally:
+            for _ in rows:
+                _CONVERSATION_QUEUE.task_done()
+
+
+def _insert_conversations(rows):
+    """
+    Insert `conversations` rows in one pipelined, all-or-nothing round-trip.
+
+    Transient failures (`OperationalError`, including `PoolTimeout`) are
+    retried up to WRITE_MAX_RETRIES times with exponential backoff, waiting
+    at most WRITE_CONNECT_TIMEOUT seconds for a connection each time. If
+    the batch is rejected because of its data (`IntegrityError`,
+    `DataError`), the rows are inserted one at a time, so a single bad row
+    doesn't discard the others. Rows that can't be saved are reported and
+    recorded in `_FAILED_CONVERSATIONS` (see `save_feedback`).
+
+    Args:
+        rows (list of tuple): The rows, in `CONVERSATION_COLUMNS` order.
+    """
+    for attempt in range(WRITE_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(WRITE_RETRY_DELAY * 2 ** (attempt - 1))
+
+        try:
+            with get_pooled_connection(
+                timeout=WRITE_CONNECT_TIMEOUT, **_DB_CONN_INFO
+            ) as conn:
+                with conn.transaction(), conn.pipeline(), conn.cursor() as cur:
+                    cur.executemany(INSERT_CONVERSATION_SQL, rows)
+            return
+        except OperationalError as e:
+            error = e
+        except (psycopg.IntegrityError, psycopg.DataError) as e:
+            print_log(
+                f"Failed to save {len(rows)} conversation(s) in a batch: {e}",
+                "-> Saving them one at a time...",
+            )
+            for row in rows:
+                _insert_conversation(row)
+            return
+        except psycopg.Error as e:
+            error = e
+            break
+
+    for row in rows:
+        _record_failed_conversation(row, error)
+
+
+def _insert_conversation(row):
+    """
+    Insert a single `conversations` row, recording it as failed on error.
+    """
+    try:
+        with get_pooled_connection(
+            timeout=WRITE_CONNECT_TIMEOUT, **_DB_CONN_INFO
+        ) as conn:
+            conn.execute(INSERT_CONVERSATION_SQL, row)
+    except psycopg.Error as e:
+        _record_failed_conversation(row, e)
+
+
+def _record_failed_conversation(row, error):
+    """
+    Report a `conversations` row that couldn't be saved, keeping its error
+    so feedback on that conversation fails with the actual cause.
+    """
+    print_log(error, "id:", row[0], "question_id:", row[1], "-> Skipped...")
+    _FAILED_CONVERSATIONS[(row[0], row[1])] = error
+
+
+def _conversation_row(
+    conversation_id, question_id, question, answer_data, timestamp=None
+):
+    """
+    Build a `conversations` row, in `CONVERSATION_COLUMNS` order, with the
+    timestamp resolved in Python so the row can also be streamed with COPY.
+    """
+    return (
+        conversation_id,
+        question_id,
+        question,
+        answer_data["answer"],
+        answer_data["model_used"],
+        answer_data["response_time"],
+        answer_data["relevance"],
+        answer_data["relevance_explanation"],
+        answer_data["prompt_tokens"],
+        answer_data["completion_tokens"],
+        answer_data["total_tokens"],
+        answer_data["eval_prompt_tokens"],
+        answer_data["eval_completion_tokens"],
+        answer_data["eval_total_tokens"],
+        answer_data["openai_cost"],
+        timestamp if timestamp is not None else datetime.now(TZ),
+    )
+
+
+def save_conversations_bulk(records):
+    """
+    Save many conversation records to the database with a single COPY.
+
+    Args:
+        records (iterable of dict): Keyword arguments of `save_conversation`
+            (conversation_id, question_id, question, answer_data and
+            optionally timestamp), one dict per record.
+    """
+    with get_pooled_connection(**_DB_CONN_INFO) as conn:
+        with conn.cursor() as cur:
+            with cur.copy(
+                f"COPY conversations ({', '.join(CONVERSATION_COLUMNS)}) FROM STDIN"
+            ) as copy:
+                for record in records:
+                    copy.write_row(_conversation_row(**record))
 
 
 def save_feedback(conversation_id, question_id, feedback, timestamp=None):
     """
     Save feedback for a conversation to the database.
 
+    Raises the error the background writer got while saving the referenced
+    conversation, if it failed, instead of a foreign key violation.
+
     Args:
         conversation_id (str): The ID of the conversation.
         question_id (str): The ID of the question.
@@ -270,23 +567,49 @@ def save_feedback(conversation_id, question_id, feedback, timestamp=None):
     if timestamp is None:
         timestamp = datetime.now(TZ)
 
-    conn_info = {
-        "postgres_host": POSTGRES_HOST,
-        "postgres_user": POSTGRES_USER,
-        "postgres_password": POSTGRES_PASSWORD,
-        "postgres_port": POSTGRES_PORT,
-        "postgres_db": POSTGRES_DB,
-    }
+    # The referenced conversation may still be queued
+    flush_conversations()
+    error = _FAILED_CONVERSATIONS.pop((conversation_id, question_id), None)
+    if error is not None:
+        raise error
 
-    with get_db_connection(**conn_info) as conn:
+    with get_pooled_connection(**_DB_CONN_INFO) as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """INSERT INTO feedback (conversation_id, question_id, feedback, timestamp) 
-                VALUES (%s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))""",
+                VALUES (%s, %s, %s, %s)""",
                 (conversation_id, question_id, feedback, timestamp),
+                prepare=True,
             )
 
 
+def save_feedback_bulk(records):
+    """
+    Save many feedback records to the database with a single COPY.
+
+    Args:
+        records (iterable of dict): Keyword arguments of `save_feedback`
+            (conversation_id, question_id, feedback and optionally timestamp),
+            one dict per record.
+    """
+    with get_pooled_connection(**_DB_CONN_INFO) as conn:
+        with conn.cursor() as cur:
+            with cur.copy(
+                "COPY feedback (conversation_id, question_id, feedback, timestamp) "
+                "FROM STDIN"
+            ) as copy:
+                for record in records:
+                    timestamp = record.get("timestamp")
+                    copy.write_row(
+                        (
+                            record["conversation_id"],
+                            record["question_id"],
+                            record["feedback"],
+                            timestamp if timestamp is not None else datetime.now(TZ),
+                        )
+                    )
+
+
 def get_recent_conversations(limit=5, relevance=None):
     """
     Retrieve recent conversations from the database with optional relevance filtering.
@@ -295,56 +618,60 @@ def get_recent_conversations(limit=5, relevance=None):
         limit (int, optional): The maximum number of conversations to retrieve. Defaults to 5.
         relevance (str, optional): The relevance filter (e.g., 'RELEVANT'). Defaults to None.
 
-    Returns:
-        list of dict: A list of conversation records with feedback information.
+    Yields:
+        dict: Conversation records with feedback information, newest first.
+
+    Notes:
+        Limits above `RECENT_CONVERSATIONS_ITERSIZE` are streamed from a
+        server-side cursor in chunks of that size, so large exports don't
+        materialize the whole result in memory; smaller ones are fetched in
+        a single round-trip and the connection is released right away.
+        When streaming, the pooled connection is held until the generator is
+        exhausted or closed; wrap the call in `list(...)` or
+        `contextlib.closing(...)` when rendering rows as they arrive.
     """
-    conn_info = {
-        "postgres_host": os.getenv("POSTGRES_HOST"),
-        "postgres_user": os.getenv("POSTGRES_USER"),
-        "postgres_password": os.getenv("POSTGRES_PASSWORD"),
-        "postgres_port": os.getenv("POSTGRES_PORT"),
-        "postgres_db": os.getenv("POSTGRES_DB"),
-    }
+    flush_conversations()
 
-    with get_db_connection(**conn_info) as conn:
-        with conn.cursor(row_factory=dict_row) as cur:
-            query = """
-                SELECT c.*, f.feedback
-                FROM conversations c
-                LEFT JOIN feedback f ON c.id = f.conversation_id
-                AND c.question_id = f.question_id
-            """
-            if relevance:
-                query += f" WHERE c.relevance = '{relevance}'"
-            query += " ORDER BY c.timestamp DESC LIMIT %s"
-
-            cur.execute(query, (limit,))
-            return cur.fetchall()
+    query = """
+        SELECT c.*, f.feedback
+        FROM conversations c
+        LEFT JOIN feedback f ON c.id = f.conversation_id
+        AND c.question_id = f.question_id
+    """
+    params = (limit,)
+    if relevance:
+        query += " WHERE c.relevance = %s"
+        params = (relevance, limit)
+    query += " ORDER BY c.timestamp DESC LIMIT %s"
+
+    if limit <= RECENT_CONVERSATIONS_ITERSIZE:
+        with get_pooled_connection(**_DB_CONN_INFO) as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                rows = cur.execute(query, params).fetchall()
+        yield from rows
+        return
+
+    with get_pooled_connection(**_DB_CONN_INFO) as conn:
+        # Server-side cursors only live inside a transaction
+        with conn.transaction(), conn.cursor(
+            name="recent_conversations", row_factory=dict_row
+        ) as cur:
+            cur.itersize = RECENT_CONVERSATIONS_ITERSIZE
+            cur.execute(query, params)
+            yield from cur
 
 
 def get_feedback_stats():
     """
     Retrieve feedback statistics, including counts of positive and negative feedback.
 
+    The counts are kept up to date by a trigger on `feedback`, so this reads
+    a single row from `feedback_stats` instead of scanning all feedback.
+
     Returns:
         dict: A dictionary with counts of 'thumbs_up' and 'thumbs_down'.
     """
-    conn_info = {
-        "postgres_host": os.getenv("POSTGRES_HOST"),
-        "postgres_user": os.getenv("POSTGRES_USER"),
-        "postgres_password": os.getenv("POSTGRES_PASSWORD"),
-        "postgres_port": os.getenv("POSTGRES_PORT"),
-        "postgres_db": os.getenv("POSTGRES_DB"),
-    }
-
-    with get_db_connection(**conn_info) as conn:
+    with get_pooled_connection(**_DB_CONN_INFO) as conn:
         with conn.cursor(row_factory=dict_row) as cur:
-            cur.execute(
-                """
-                SELECT 
-                    SUM(CASE WHEN feedback > 0 THEN 1 ELSE 0 END) as thumbs_up,
-                    SUM(CASE WHEN feedback < 0 THEN 1 ELSE 0 END) as thumbs_down
-                FROM feedback
-            """
-            )
+            cur.execute("SELECT thumbs_up, thumbs_down FROM feedback_stats")
             return cur.fetchone()
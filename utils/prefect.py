@@ -4,85 +4,176 @@ The utilities include functions to:
     1. Retrieve a deployment ID by its name and associated flow name.
     2. Create and trigger a deployment run with specified parameters.
     3. Monitor task status until done
+    4. Trigger a deployment run and wait for it, all with one client
+
+Each function accepts an open `client` so a caller can share one Prefect
+client (and its connection pool) across calls made in the same event loop.
 
 These functions simplify managing and automating Prefect workflows programmatically.
 """
 
+import asyncio
+import random
 import time
+from contextlib import asynccontextmanager
 
 from prefect.client import get_client
+from prefect.client.schemas.filters import DeploymentFilter, DeploymentFilterName
+from prefect.exceptions import ObjectNotFound
 from prefect.states import StateType
 
+TERMINAL_STATE_TYPES = frozenset(
+    {StateType.COMPLETED, StateType.FAILED, StateType.CANCELLED}
+)
+
+POLL_INITIAL_DELAY = 0.1
+POLL_BACKOFF_FACTOR = 1.3
+POLL_MAX_DELAY = 60
+
+DEPLOYMENT_ID_TTL = 300
+
+# (deployment_name, flow_name) -> (deployment_id, expiry time)
+_DEPLOYMENT_IDS = {}
 
-async def get_deployment_id_by_name(deployment_name: str, flow_name: str):
+
+@asynccontextmanager
+async def _client_session(client=None):
+    """
+    Yield `client` if given, otherwise a new Prefect client that is closed on exit.
+    """
+    if client is not None:
+        yield client
+    else:
+        async with get_client() as new_client:
+            yield new_client
+
+
+async def get_deployment_id_by_name(deployment_name: str, flow_name: str, client=None):
     """
     Retrieve the ID of a Prefect deployment given its deployment name and flow name.
 
     Args:
         deployment_name (str): The name of the deployment.
         flow_name (str): The name of the flow associated with the deployment.
+        client (PrefectClient, optional): An open client to reuse. Defaults to
+                                          a new client for this call.
 
     Returns:
         str or None: The deployment ID if found, otherwise None.
+
+    Deployments are filtered by name on the server, and found IDs are cached
+    for DEPLOYMENT_ID_TTL seconds (or until a run creation reports the
+    deployment missing).
     """
-    client = get_client()
-    deployments = await client.read_deployments()  # Fetch all deployments
+    cache_key = (deployment_name, flow_name)
+    cached = _DEPLOYMENT_IDS.get(cache_key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    async with _client_session(client) as session:
+        deployments = await session.read_deployments(
+            deployment_filter=DeploymentFilter(
+                name=DeploymentFilterName(any_=[deployment_name])
+            )
+        )
 
     for deployment in deployments:
-        if (
-            deployment.name == deployment_name
-            and flow_name == deployment.entrypoint.split(":")[-1]
-        ):
+        if flow_name == deployment.entrypoint.split(":")[-1]:
+            _DEPLOYMENT_IDS[cache_key] = (
+                deployment.id,
+                time.monotonic() + DEPLOYMENT_ID_TTL,
+            )
             return deployment.id
 
     return None
 
 
-async def create_deployment_run(deployment_id: str, parameters: dict):
+async def create_deployment_run(deployment_id: str, parameters: dict, client=None):
     """
     Create and trigger a deployment run using the given deployment ID and parameters.
 
     Args:
         deployment_id (str): The ID of the deployment to trigger.
         parameters (dict): The parameters to pass to the deployment run.
+        client (PrefectClient, optional): An open client to reuse. Defaults to
+                                          a new client for this call.
 
     Returns:
         prefect.engine.state.State: The state of the triggered flow run.
     """
-    client = get_client()
-    return await client.create_flow_run_from_deployment(
-        deployment_id=deployment_id,
-        parameters=parameters,
-    )
-
-
-async def monitor_run_status(run_id: str):
+    try:
+        async with _client_session(client) as session:
+            return await session.create_flow_run_from_deployment(
+                deployment_id=deployment_id,
+                parameters=parameters,
+            )
+    except ObjectNotFound:
+        # The deployment was deleted or recreated; drop its cached ID
+        for cache_key, (cached_id, _) in list(_DEPLOYMENT_IDS.items()):
+            if cached_id == deployment_id:
+                del _DEPLOYMENT_IDS[cache_key]
+        raise
+
+
+async def monitor_run_status(run_id: str, client=None):
     """
     Monitor the status of a Prefect run until it is terminated.
 
     Parameters:
         run_id (str): The ID of the Prefect run to monitor.
+        client (PrefectClient, optional): An open client to reuse. Defaults to
+                                          a new client for this call.
 
     Returns:
-        None: Prints 1 if the run completes successfully,
-              prints 2 if the run fails or is canceled.
+        StateType: The terminal state type of the run (COMPLETED, FAILED,
+                   or CANCELLED).
 
-    The function continuously checks the status of the given `run_id` until
-    it reaches a terminal state (COMPLETED, FAILED, or CANCELLED). It then
-    prints 1 for successful completion and 2 otherwise.
+    The function checks the status of the given `run_id` until it reaches a
+    terminal state (COMPLETED, FAILED, or CANCELLED), waiting between checks
+    with a jittered exponential backoff (from POLL_INITIAL_DELAY up to
+    POLL_MAX_DELAY seconds) that doesn't block the event loop.
     """
-    async with get_client() as client:
+    delay = POLL_INITIAL_DELAY
+
+    async with _client_session(client) as session:
         while True:
-            flow_run = await client.read_flow_run(run_id)
+            flow_run = await session.read_flow_run(run_id)
             state = flow_run.state
 
-            if state.type in {
-                StateType.COMPLETED,
-                StateType.FAILED,
-                StateType.CANCELLED,
-            }:
+            if state.type in TERMINAL_STATE_TYPES:
                 return state.type
 
-            # Wait for a few seconds before checking again
             print(f"Waiting for run with run_id '{run_id}' to finish...")
-            time.sleep(5)
+            await asyncio.sleep(delay * random.uniform(0.9, 1.1))
+            delay = min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
+
+
+async def run_deployment_and_wait(
+    deployment_name: str, flow_name: str, parameters: dict
+):
+    """
+    Trigger a deployment run and wait for it to finish, sharing one Prefect
+    client across the lookup, the trigger and the monitoring.
+
+    Args:
+        deployment_name (str): The name of the deployment.
+        flow_name (str): The name of the flow associated with the deployment.
+        parameters (dict): The parameters to pass to the deployment run.
+
+    Returns:
+        tuple: The created flow run and its terminal state type.
+    """
+    async with get_client() as client:
+        deployment_id = await get_deployment_id_by_name(
+            deployment_name=deployment_name,
+            flow_name=flow_name,
+            client=client,
+        )
+        run = await create_deployment_run(
+            deployment_id=deployment_id,
+            parameters=parameters,
+            client=client,
+        )
+        run_state = await monitor_run_status(run.id, client=client)
+
+    return run, run_state
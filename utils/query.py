@@ -1,10 +1,11 @@
 """
 This module provides functions for searching and generating prompts using various models.
 It includes functions to:
-    1. Search using MinSearch or Elasticsearch.
+    1. Answer questions from Elasticsearch search results (see `utils.search`;
+       `utils.query_async` holds the async and batch counterparts).
     2. Build context from search results.
     3. Construct prompts from templates.
-    4. Generate responses using language models.
+    4. Generate responses using language models, synchronously or with asyncio.
     5. Evaluate relevance of responses.
     6. Calculate costs for OpenAI API usage.
 
@@ -14,25 +15,62 @@ outputs by combining search, prompt engineering, and model-driven evaluation.
 
 import json
 import os
+import string
 import time
-
-from exceptions.exceptions import QueryTypeWrongValueError, WrongPomptParams
-from utils.ollama import get_embedding
-from utils.utils import (
-    find_parameters,
-    flatten_list_of_lists,
-    is_sublist,
-    parse_json_response,
-)
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+
+from exceptions.exceptions import WrongPomptParams
+from utils.llm_cache import get_cached_response, set_cached_response
+from utils.ollama import create_async_ollama_client
+from utils.openai import create_async_openai_client
+from utils.search import get_search_results
+from utils.utils import find_parameters
 from utils.variables import (
-    ES_CLIENT,
+    EVAL_MODEL,
     EVAL_PROMPT_TEMPLATE_PATH,
-    INDEX_NAME,
+    LLM_CACHE_PATH,
     OLLAMA_CLIENT,
+    OLLAMA_HOST,
+    OLLAMA_PORT,
     OPENAI_CLIENT,
     QA_PROMPT_TEMPLATE_PATH,
 )
 
+_FORMATTER = string.Formatter()
+
+# The fields of a search result rendered by build_context
+_CONTEXT_FIELDS = itemgetter("title", "tags", "text")
+
+# Sync clients by model provider (the prefix of a model choice)
+_CLIENTS = {"ollama": OLLAMA_CLIENT, "openai": OPENAI_CLIENT}
+
+# USD per 1K (prompt, completion) tokens; other models are free (local)
+OPENAI_PRICING = {
+    "openai/gpt-3.5-turbo": (0.0015, 0.002),
+    "openai/gpt-4o": (0.005, 0.015),
+    "openai/gpt-4o-mini": (0.00015, 0.0006),
+}
+
+# JSON mode for the judge model (Ollama maps it to format="json")
+JSON_RESPONSE = {"type": "json_object"}
+
+# Completion arguments of the judge model: JSON output, greedy decoding.
+# They are part of the LLM cache key, so judgments cached under other
+# arguments (e.g. sampled at the default temperature) are not served.
+EVAL_KWARGS = {"response_format": JSON_RESPONSE, "temperature": 0}
+
+# Evaluation fields of answers generated without evaluation
+SKIPPED_EVALUATION = {
+    "relevance": "UNKNOWN",
+    "explanation": "",
+    "tokens": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+}
+
+# Streamed completions report their token usage in a final chunk
+STREAM_KWARGS = {"stream": True, "stream_options": {"include_usage": True}}
+
 
 def build_context(search_results):
     """
@@ -44,15 +82,12 @@ def build_context(search_results):
     Returns:
         str: A formatted string of the search results.
     """
-    context = ""
-
-    for doc in search_results:
-        context = (
-            context
-            + f"title: {doc['title']}\ntags: {doc['tags']}\nanswer: {doc['text']}\n\n"
-        )
-
-    return context
+    return "".join(
+        [
+            f"title: {title}\ntags: {tags}\nanswer: {text}\n\n"
+            for title, tags, text in map(_CONTEXT_FIELDS, search_results)
+        ]
+    )
 
 
 def build_prompt(prompt_template_path=None, **document_dict):
@@ -74,325 +109,374 @@ def build_prompt(prompt_template_path=None, **document_dict):
     if not prompt_template_path:
         prompt_template_path = QA_PROMPT_TEMPLATE_PATH
 
-    with open(prompt_template_path, "r", encoding="utf-8") as f:
-        prompt_template = f.read().strip()
-
-    expected_params = sorted(find_parameters(prompt_template))
-    provided_params = sorted(list(document_dict.keys()))
-
-    if not is_sublist(main_list=provided_params, sublist=expected_params):
+    chunks, expected_params = _load_template(
+        prompt_template_path, os.path.getmtime(prompt_template_path)
+    )
+    if not expected_params.issubset(document_dict.keys()):
         raise WrongPomptParams(
-            f"Expected presence of {expected_params}, but got {provided_params}"
+            f"Expected presence of {sorted(expected_params)}, "
+            f"but got {sorted(document_dict.keys())}"
         )
 
-    prompt = prompt_template.format(**document_dict)
+    parts = []
+    for literal, field_name, format_spec, conversion in chunks:
+        parts.append(literal)
+        if field_name is None:
+            continue
+        value = document_dict[field_name]
+        if conversion or format_spec:
+            value = _FORMATTER.format_field(
+                _FORMATTER.convert_field(value, conversion), format_spec
+            )
+        parts.append(str(value))
 
-    return prompt
+    return "".join(parts)
 
 
-def elastic_search_text(query, title_query=None, boost=None, size=5):
+def build_messages(prompt_template_path=None, **document_dict):
     """
-    Perform a text-based search using Elasticsearch.
+    Build chat messages from a template and document dictionary.
+
+    The static lines before the line of the template's first parameter are
+    sent as a system message and the rest as a user message, so the unchanging prefix
+    can be served from the provider's prompt cache (OpenAI caches repeated
+    prompt prefixes automatically).
 
     Args:
-        query (str): The main query string to search for.
-        title_query (str, Optional): An optional title filter to narrow the search.
-        boost (float, Optional): An optional boost to the qeury
-        size (int): Number of documents to retrieve, Default is 5.
+        prompt_template_path (str, optional): Path to the prompt template. If not provided,
+                                              it defaults to QA_PROMPT_TEMPLATE_PATH.
+        document_dict (dict): Dictionary of document parameters.
 
     Returns:
-        list: A list of search results matching the query.
-    """
-    search_query = {
-        "_source": ["text", "title", "tags", "chunk_id", "id"],
-        "size": size,
-        "query": {
-            "bool": {
-                "must": {
-                    "multi_match": {
-                        "query": query,
-                        "fields": ["text", "title"],
-                        "type": "best_fields",
-                    }
-                }
-            }
-        },
-    }
-
-    if title_query:
-        search_query["query"]["bool"]["filter"] = {
-            "match": {"title": {"query": title_query, "fuzziness": "AUTO"}}
-        }
+        list of dict: The chat messages.
 
-    if boost:
-        search_query["query"]["bool"]["must"]["multi_match"]["boost"] = boost
+    Raises:
+        WrongPomptParams: If the document dictionary does not match the expected parameters
+                          in the template.
+    """
+    if not prompt_template_path:
+        prompt_template_path = QA_PROMPT_TEMPLATE_PATH
 
-    responses = ES_CLIENT.search(
-        index=INDEX_NAME,
-        body=search_query,
+    prompt = build_prompt(prompt_template_path, **document_dict)
+    chunks, _ = _load_template(
+        prompt_template_path, os.path.getmtime(prompt_template_path)
     )
 
+    prefix = []
+    for literal, field_name, _, _ in chunks:
+        prefix.append(literal)
+        if field_name is not None:
+            break
+    else:
+        # No parameters, nothing to split
+        return [{"role": "user", "content": prompt}]
+
+    # Split at the line break before the first parameter
+    cut = "".join(prefix).rfind("\n")
+    if cut == -1 or not prompt[:cut].strip():
+        return [{"role": "user", "content": prompt}]
+
     return [
-        {"_id": hit["_id"], "_score": hit["_score"], **hit["_source"]}
-        for hit in responses["hits"]["hits"]
+        {"role": "system", "content": prompt[:cut].strip()},
+        {"role": "user", "content": prompt[cut + 1 :]},
     ]
 
 
-def elastic_search_knn(query_vector, title_query=None, boost=None, size=5):
+@lru_cache(maxsize=32)
+def _load_template(prompt_template_path, mtime):  # pylint: disable=unused-argument
     """
-    Perform a K-Nearest Neighbors (KNN) search using Elasticsearch.
+    Read and parse a prompt template, cached per path and modification time
+    so edited templates are picked up.
 
-    Args:
-        query_vector (list): The query vector for similarity search.
-        title_query (str, Optional): An optional title filter to narrow the search.
-        boost (float, Optional): An optional boost to the qeury
-        size (int): Number of documents to retrieve, Default is 5.
+    The template is parsed once into (literal, field_name, format_spec,
+    conversion) chunks, so building a prompt doesn't reparse it like
+    `str.format` would.
 
     Returns:
-        list: A list of search results matching the query.
+        tuple: The parsed template chunks (tuple) and its parameter names (frozenset).
     """
-    knn = {
-        "field": "text_vector",
-        "query_vector": query_vector,
-        "k": 5,
-        "num_candidates": 10_000,
-    }
-
-    if title_query:
-        knn["filter"] = {
-            "match": {"title": {"query": title_query, "fuzziness": "AUTO"}}
-        }
-
-    if boost:
-        knn["boost"] = boost
-
-    search_query = {
-        "knn": knn,
-        "size": size,
-        "_source": ["text", "title", "tags", "chunk_id", "id"],
-    }
+    with open(prompt_template_path, "r", encoding="utf-8") as f:
+        prompt_template = f.read().strip()
 
-    responses = ES_CLIENT.search(
-        index=INDEX_NAME,
-        body=search_query,
+    return (
+        tuple(_FORMATTER.parse(prompt_template)),
+        frozenset(find_parameters(prompt_template)),
     )
 
-    return [
-        {"_id": hit["_id"], "_score": hit["_score"], **hit["_source"]}
-        for hit in responses["hits"]["hits"]
-    ]
 
-
-def compute_rrf(rank, k=60):
+def llm(
+    prompt,
+    model_choice="ollama/gemma:2b",
+    on_token=None,
+    use_cache=False,
+    **completion_kwargs,
+):
     """
-    Compute the Reciprocal Rank Fusion (RRF) score for a given document rank.
-
-    The RRF score is calculated as 1 / (k + rank), where 'k' is a tunable
-    parameter that defines how much emphasis is placed on lower-ranked results.
+    Generate a response using a language model.
 
-    Parameters:
-    ----------
-    rank : int
-        The rank of the document (1-based index).
-    k : int, optional
-        The constant used to adjust the impact of the rank in the RRF calculation.
-        Default is 60.
+    Args:
+        prompt (str or list of dict): The prompt to be passed to the language
+                                      model, or its chat messages (see
+                                      `build_messages`).
+        model_choice (str, optional): The model to use for generating the response.
+                                      Defaults to "ollama/gemma:2b".
+        on_token (callable, optional): If given, the response is streamed and
+                                       `on_token` is called with each piece of
+                                       text as it arrives.
+        use_cache (bool or callable, optional): Whether to serve repeated
+                                    (model, prompt, completion_kwargs) requests
+                                    from the persistent response cache at
+                                    LLM_CACHE_PATH. Cached responses report zero
+                                    tokens and response time. If a callable, a
+                                    generated response is only stored when
+                                    `use_cache(answer)` is true (e.g. once it
+                                    parses). Defaults to False.
+        **completion_kwargs: Additional arguments for the chat completion
+                             request (e.g. `response_format`).
 
     Returns:
-    -------
-    float
-        The reciprocal relevance score for the document.
+        tuple: The generated answer (str), token usage (dict), and response time (float).
     """
-    return 1 / (k + rank)
+    if use_cache:
+        cached = _cached_completion(prompt, model_choice, on_token, completion_kwargs)
+        if cached:
+            return cached
 
+    start_time = time.time()
 
-def compute_documents_rrf(k, *results_args):
-    """
-    Calculate the RRF scores for documents from multiple result sets.
+    provider, model_name = _parse_model_choice(model_choice)
+    messages = _as_messages(prompt)
+    client = _CLIENTS[provider]
 
-    This function computes the cumulative RRF score for each document
-    across multiple ranked result sets.
+    if on_token is None:
+        answer, tokens = _parse_completion(
+            client.chat.completions.create(
+                model=model_name, messages=messages, **completion_kwargs
+            )
+        )
+    else:
+        answer, tokens = _consume_stream(
+            client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                **STREAM_KWARGS,
+                **completion_kwargs,
+            ),
+            on_token,
+        )
 
-    Parameters:
-    ----------
-    k : int
-        The constant used in the RRF calculation.
-    *results_args : list of list of dict
-        Each argument is a list of results, where each result is a dictionary
-        representing a document with an '_id' key. The rank is derived from the
-        index within each result list.
+    response_time = time.time() - start_time
 
-    Returns:
-    -------
-    list of tuple
-        A list of tuples where each tuple contains a document ID and its
-        cumulative RRF score, sorted in descending order by score.
-    """
-    rrf_scores = {}
-    for results in results_args:
-        for rank, hit in enumerate(results):
-            doc_id = hit["_id"]
-            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + compute_rrf(rank + 1, k)
+    if use_cache and (not callable(use_cache) or use_cache(answer)):
+        set_cached_response(
+            LLM_CACHE_PATH,
+            model_choice,
+            json.dumps(messages),
+            answer,
+            completion_kwargs,
+        )
 
-    return sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)
+    return answer, tokens, response_time
 
 
-def elastic_search_hybrid_rrf(
-    query, query_vector, k=60, title_query=None, vector_boost=None
+async def allm(
+    prompt,
+    client,
+    model_choice="ollama/gemma:2b",
+    on_token=None,
+    use_cache=False,
+    **completion_kwargs,
 ):
     """
-    Perform a hybrid search using Elasticsearch by combining text-based and
-    vector-based search results, then re-ranking them using RRF.
-
-    Parameters:
-    ----------
-    query : str
-        The text query used for the traditional keyword search.
-    query_vector : list or ndarray
-        The vector representing the query, used for the k-NN (vector) search.
-    k : int, optional
-        The constant used in the RRF calculation. Default is 60.
-    title_query : str, optional
-        An additional query for targeting specific fields like titles.
-    vector_boost : float, optional
-        The weight assigned to the vector-based search results relative to
-        the text-based results. Must be a float between 0 and 1. If None,
-        both text and vector search are given equal weight (0.5).
+    Asynchronously generate a response using a language model.
+
+    Args:
+        prompt (str or list of dict): The prompt to be passed to the language
+                                      model, or its chat messages (see
+                                      `build_messages`).
+        client (AsyncOpenAI): The async client serving `model_choice`
+                              (see `create_async_llm_client`).
+        model_choice (str, optional): The model to use for generating the response.
+                                      Defaults to "ollama/gemma:2b".
+        on_token (callable, optional): If given, the response is streamed and
+                                       `on_token` is called with each piece of
+                                       text as it arrives.
+        use_cache (bool or callable, optional): Whether to serve repeated
+                                    (model, prompt, completion_kwargs) requests
+                                    from the persistent response cache at
+                                    LLM_CACHE_PATH. Cached responses report zero
+                                    tokens and response time. If a callable, a
+                                    generated response is only stored when
+                                    `use_cache(answer)` is true (e.g. once it
+                                    parses). Defaults to False.
+        **completion_kwargs: Additional arguments for the chat completion
+                             request (e.g. `response_format`).
 
     Returns:
-    -------
-    list of dict
-        A list of the top-K documents, sorted by their RRF score. Each document
-        contains its original content plus an additional key 'rrf_score'
-        indicating its RRF score.
+        tuple: The generated answer (str), token usage (dict), and response time (float).
+    """
+    if use_cache:
+        cached = _cached_completion(prompt, model_choice, on_token, completion_kwargs)
+        if cached:
+            return cached
 
-    Raises:
-    -------
-    AssertionError
-        If vector_boost is provided but is not a float between 0 and 1.
-    """
-    assert vector_boost is None or (
-        isinstance(vector_boost, (float, int)) and 0 <= vector_boost <= 1
-    ), (
-        f"Incorrect value '{vector_boost}' for vector_boost, "
-        "must be a float or int between [0, 1] or None"
-    )
+    start_time = time.time()
 
-    if vector_boost:
-        text_boost = 1 - vector_boost
+    model_name = _parse_model_choice(model_choice)[1]
+    messages = _as_messages(prompt)
+
+    if on_token is None:
+        answer, tokens = _parse_completion(
+            await client.chat.completions.create(
+                model=model_name, messages=messages, **completion_kwargs
+            )
+        )
     else:
-        vector_boost = text_boost = 0.5
+        answer, tokens = await _aconsume_stream(
+            await client.chat.completions.create(
+                model=model_name,
+                messages=messages,
+                **STREAM_KWARGS,
+                **completion_kwargs,
+            ),
+            on_token,
+        )
 
-    knn_results = elastic_search_knn(
-        query_vector, title_query=title_query, boost=vector_boost, size=10
-    )
-    keyword_results = elastic_search_text(
-        query, title_query=title_query, boost=text_boost, size=10
-    )
+    response_time = time.time() - start_time
 
-    results = knn_results + keyword_results
-    result_ids = [doc["_id"] for doc in results]
+    if use_cache and (not callable(use_cache) or use_cache(answer)):
+        set_cached_response(
+            LLM_CACHE_PATH,
+            model_choice,
+            json.dumps(messages),
+            answer,
+            completion_kwargs,
+        )
 
-    rrf_scores = compute_documents_rrf(k, knn_results, keyword_results)
+    return answer, tokens, response_time
 
-    # Get top-K documents by the score
-    final_results = []
-    for doc_id, rrf_score in rrf_scores[:5]:
-        doc = results[result_ids.index(doc_id)]
-        doc["rrf_score"] = rrf_score
-        final_results.append(doc)
 
-    return final_results
+def _as_messages(prompt):
+    """
+    Wrap a prompt string into a single user message; message lists (see
+    `build_messages`) are returned as is.
+    """
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
 
 
-def elastic_search_hybrid_rrf_qr(
-    query, query_rewriting_results, k=60, title_query=None, vector_boost=None
-):
+def _cached_completion(prompt, model_choice, on_token, completion_kwargs=None):
     """
-    Performs a hybrid search using the original query and rewritten results,
-    applying Reciprocal Rank Fusion (RRF) to rank and merge the results.
-
-    The function takes the original query and its rewritten variations,
-    conducts a hybrid search for each, and then applies RRF to combine and
-    rank the results. The top `k` results based on the RRF score are returned.
-
-    Parameters:
-    -----------
-    query : str
-        The original query string.
-    query_rewriting_results : list of str
-        A list of rewritten queries derived from the original query.
-    k : int, optional
-        The number of top results to return after applying RRF, default is 60.
-    title_query : str, optional
-        An additional query parameter for title-based search, default is None.
-    vector_boost : float, optional
-        A boost value for vector-based search results, default is None.
+    Look up a cached response (see `llm`), passing it to `on_token` if given.
 
     Returns:
-    --------
-    list of dict
-        A list of the top `k` search results, each containing the RRF score.
-    """
-    results = [
-        elastic_search_hybrid_rrf(
-            query=query,
-            query_vector=get_embedding(OLLAMA_CLIENT, query),
-            k=k,
-            title_query=title_query,
-            vector_boost=vector_boost,
-        )
-        for query in query_rewriting_results + [query]
-    ]
-    flattened_results = flatten_list_of_lists(results)
-    result_ids = [doc["_id"] for doc in flattened_results]
-    rrf_results = compute_documents_rrf(k, *results)
+        tuple or None: The answer, zero token usage and zero response time,
+                       or None on a cache miss.
+    """
+    answer = get_cached_response(
+        LLM_CACHE_PATH,
+        model_choice,
+        json.dumps(_as_messages(prompt)),
+        completion_kwargs,
+    )
+    if answer is None:
+        return None
 
-    final_results = []
-    for doc_id, rrf_score in rrf_results[:5]:
-        doc = flattened_results[result_ids.index(doc_id)]
-        doc["rrf_score"] = rrf_score
-        final_results.append(doc)
+    if on_token is not None:
+        on_token(answer)
+    return answer, _usage_tokens(None), 0.0
 
-    return final_results
 
+@lru_cache(maxsize=64)
+def _parse_model_choice(model_choice):
+    """
+    Split a model choice like "ollama/gemma:2b" into its provider and model name.
 
-def llm(prompt, model_choice="ollama/gemma:2b"):
+    Raises:
+        ValueError: If the provider is unknown.
     """
-    Generate a response using a language model.
+    provider, _, model_name = model_choice.partition("/")
+    if provider not in _CLIENTS or not model_name:
+        raise ValueError(f"Unknown model choice: {model_choice}")
+    return provider, model_name
 
-    Args:
-        prompt (str): The prompt to be passed to the language model.
-        model_choice (str, optional): The model to use for generating the response.
-                                      Defaults to "ollama/gemma:2b".
+
+def _parse_completion(response):
+    """
+    Extract the answer and token usage from a chat completion response.
+    """
+    return response.choices[0].message.content, _usage_tokens(response.usage)
+
+
+def _consume_stream(stream, on_token):
+    """
+    Join the text of a streamed completion, passing each piece to `on_token`.
 
     Returns:
-        tuple: The generated answer (str), token usage (dict), and response time (float).
+        tuple: The answer (str) and token usage (dict).
     """
-    start_time = time.time()
+    parts, usage = [], None
+    for chunk in stream:
+        usage = _consume_chunk(chunk, parts, on_token) or usage
+    return "".join(parts), _usage_tokens(usage)
 
-    if model_choice.startswith("ollama/"):
-        client = OLLAMA_CLIENT
-    elif model_choice.startswith("openai/"):
-        client = OPENAI_CLIENT
-    else:
-        raise ValueError(f"Unknown model choice: {model_choice}")
 
-    response = client.chat.completions.create(
-        model=model_choice.split("/")[-1],
-        messages=[{"role": "user", "content": prompt}],
-    )
-    answer = response.choices[0].message.content
-    tokens = {
-        "prompt_tokens": response.usage.prompt_tokens,
-        "completion_tokens": response.usage.completion_tokens,
-        "total_tokens": response.usage.total_tokens,
+async def _aconsume_stream(stream, on_token):
+    """
+    Asynchronous counterpart of `_consume_stream`.
+    """
+    parts, usage = [], None
+    async for chunk in stream:
+        usage = _consume_chunk(chunk, parts, on_token) or usage
+    return "".join(parts), _usage_tokens(usage)
+
+
+def _consume_chunk(chunk, parts, on_token):
+    """
+    Append the text of a streamed completion chunk to `parts`, passing it to
+    `on_token`, and return the chunk's token usage (only set on the last chunk).
+    """
+    if chunk.choices:
+        content = chunk.choices[0].delta.content
+        if content:
+            parts.append(content)
+            on_token(content)
+    return chunk.usage
+
+
+def _usage_tokens(usage):
+    """
+    Convert a completion usage object into a token usage dictionary, with
+    zero counts if the server didn't report usage.
+    """
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
     }
 
-    end_time = time.time()
-    response_time = end_time - start_time
 
-    return answer, tokens, response_time
+def create_async_llm_client(model_choice):
+    """
+    Create an async client for the provider of `model_choice`.
+
+    Async clients aren't shared between calls since their connection pool
+    is bound to the event loop they were first used in; close them with
+    `async with` once done.
+
+    Args:
+        model_choice (str): The model, prefixed by its provider ("ollama/" or "openai/").
+
+    Returns:
+        AsyncOpenAI: An async client for the model's provider.
+    """
+    provider, _ = _parse_model_choice(model_choice)
+    if provider == "ollama":
+        return create_async_ollama_client(OLLAMA_HOST, OLLAMA_PORT)
+    return create_async_openai_client()
 
 
 def evaluate_relevance(question, answer, eval_model):
@@ -407,98 +491,95 @@ def evaluate_relevance(question, answer, eval_model):
     Returns:
         tuple: Relevance (str), explanation (str), and token usage (dict).
     """
-    prompt = build_prompt(
+    prompt = build_messages(
         EVAL_PROMPT_TEMPLATE_PATH, **{"question": question, "answer": answer}
     )
 
-    evaluation, tokens, _ = llm(prompt, eval_model)
+    evaluation, tokens, _ = llm(
+        prompt, eval_model, use_cache=_is_valid_evaluation, **EVAL_KWARGS
+    )
 
-    try:
-        json_eval = parse_json_response(evaluation)
-        return json_eval["Relevance"], json_eval["Explanation"], tokens
-    except json.JSONDecodeError:
-        return "UNKNOWN", "Failed to parse evaluation", tokens
+    return _parse_evaluation(evaluation, tokens)
 
 
-def calculate_openai_cost(model_choice, tokens):
+async def aevaluate_relevance(question, answer, eval_model, client):
     """
-    Calculate the cost of using OpenAI API based on token usage.
+    Asynchronously evaluate the relevance of a generated answer using a language model.
 
     Args:
-        model_choice (str): The model used for generating the response.
-        tokens (dict): The token usage dictionary.
+        question (str): The original question.
+        answer (str): The generated answer to evaluate.
+        eval_model (str): The model to use for evaluating the relevance.
+        client (AsyncOpenAI): The async client serving `eval_model`.
 
     Returns:
-        float: The calculated cost in USD.
+        tuple: Relevance (str), explanation (str), and token usage (dict).
     """
-    openai_cost = 0
+    prompt = build_messages(
+        EVAL_PROMPT_TEMPLATE_PATH, **{"question": question, "answer": answer}
+    )
 
-    if model_choice == "openai/gpt-3.5-turbo":
-        openai_cost = (
-            tokens["prompt_tokens"] * 0.0015 + tokens["completion_tokens"] * 0.002
-        ) / 1000
-    elif model_choice in ["openai/gpt-4o", "openai/gpt-4o-mini"]:
-        openai_cost = (
-            tokens["prompt_tokens"] * 0.03 + tokens["completion_tokens"] * 0.06
-        ) / 1000
+    evaluation, tokens, _ = await allm(
+        prompt, client, eval_model, use_cache=_is_valid_evaluation, **EVAL_KWARGS
+    )
 
-    return openai_cost
+    return _parse_evaluation(evaluation, tokens)
 
 
-def get_search_results(query, title_query, search_type):
+def _parse_evaluation(evaluation, tokens):
     """
-    Perform a search based on the specified search type.
+    Parse the judge model's JSON output into (relevance, explanation, tokens).
 
-    This function supports different search methods, including vector-based,
-    text-based, and hybrid approaches. It returns results based on the selected
-    search type.
+    The judge runs in JSON mode (see JSON_RESPONSE), so its output is parsed
+    directly; an object missing the expected keys counts as a failed parse.
+    """
+    relevance_explanation = _load_evaluation(evaluation)
+    if relevance_explanation is None:
+        return "UNKNOWN", "Failed to parse evaluation", tokens
+    return *relevance_explanation, tokens
 
-    Parameters:
-    ----------
-    query : str
-        The main search query to be processed.
-    title_query : str
-        An optional query to target specific fields like titles.
-    search_type : str
-        The type of search to perform. It must be one of the following:
-        - "Vector": Performs a k-NN (vector-based) search using the query embedding.
-        - "Text": Performs a traditional keyword search.
-        - "Hybrid": Combines the results of both vector-based and text-based searches,
-          re-ranking the documents using Reciprocal Rank Fusion (RRF).
 
-    Returns:
-    -------
-    list of dict
-        A list of search results. Each result is a dictionary containing the relevant
-        information about a document.
+def _is_valid_evaluation(evaluation):
+    """
+    Whether the judge's output parses (see `_parse_evaluation`), so malformed
+    or truncated judgments aren't cached and are retried on the next call.
+    """
+    return _load_evaluation(evaluation) is not None
 
-    Raises:
-    -------
-    QueryTypeWrongValueError
-        If `search_type` is not one of "Text", "Vector", or "Hybrid".
-    """
-    if search_type == "Vector":
-        query_vector = get_embedding(
-            client=OLLAMA_CLIENT,
-            text=query,
-            model_name=os.getenv("EMBED_MODEL", "nomic-embed-text"),
-        )
-        return elastic_search_knn(query_vector, title_query)
 
-    if search_type == "Text":
-        return elastic_search_text(query, title_query)
+def _load_evaluation(evaluation):
+    """
+    Return the (relevance, explanation) of the judge's output, or None if it
+    doesn't parse.
+    """
+    try:
+        json_eval = json.loads(evaluation)
+        return json_eval["Relevance"], json_eval["Explanation"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
 
-    if search_type == "Hybrid":
-        query_vector = get_embedding(
-            client=OLLAMA_CLIENT,
-            text=query,
-            model_name=os.getenv("EMBED_MODEL", "nomic-embed-text"),
-        )
-        return elastic_search_hybrid_rrf(query, query_vector, title_query=title_query)
+def calculate_openai_cost(model_choice, tokens):
+    """
+    Calculate the cost of using OpenAI API based on token usage.
 
-    raise QueryTypeWrongValueError(
-        "`search_type` must be either 'Text', 'Vector', or 'Hybrid'"
-    )
+    Args:
+        model_choice (str): The model used for generating the response.
+        tokens (dict): The token usage dictionary.
+
+    Returns:
+        float: The calculated cost in USD.
+    """
+    pricing = OPENAI_PRICING.get(model_choice)
+    if pricing is None:
+        # Local (Ollama) models are free
+        return 0
+
+    prompt_price, completion_price = pricing
+    return (
+        tokens["prompt_tokens"] * prompt_price
+        + tokens["completion_tokens"] * completion_price
+    ) / 1000
 
 
 def process_search_results(search_results):
@@ -514,13 +595,13 @@ def process_search_results(search_results):
             and a set of unique titles (set).
     """
     tags = "#" + "; #".join(
-        set(flatten_list_of_lists([doc["tags"] for doc in search_results]))
+        set(chain.from_iterable(doc["tags"] for doc in search_results))
     )
     titles = {doc["title"] for doc in search_results}
     return tags, titles
 
 
-def generate_answer(query, context, model_choice):
+def generate_answer(query, context, model_choice, on_token=None):
     """
     Generate an answer using the specified model.
 
@@ -528,14 +609,15 @@ def generate_answer(query, context, model_choice):
         query (str): The original question or query.
         context (str): The context built from search results.
         model_choice (str): The model to use for generating the answer.
+        on_token (callable, optional): Streams the answer to `on_token` (see `llm`).
 
     Returns:
         tuple: The generated answer (str), token usage (dict),
             and response time (float).
     """
     document_dict = {"question": query, "context": context}
-    prompt = build_prompt(QA_PROMPT_TEMPLATE_PATH, **document_dict)
-    return llm(prompt=prompt, model_choice=model_choice)
+    prompt = build_messages(QA_PROMPT_TEMPLATE_PATH, **document_dict)
+    return llm(prompt=prompt, model_choice=model_choice, on_token=on_token)
 
 
 def evaluate_answer(query, answer, eval_model):
@@ -555,7 +637,28 @@ def evaluate_answer(query, answer, eval_model):
     return {"relevance": relevance, "explanation": explanation, "tokens": eval_tokens}
 
 
-def get_answer(query, title_query, model_choice, search_type):
+async def agenerate_answer(query, context, model_choice, client):
+    """
+    Asynchronous counterpart of `generate_answer`, using `client` (see `allm`).
+    """
+    document_dict = {"question": query, "context": context}
+    prompt = build_messages(QA_PROMPT_TEMPLATE_PATH, **document_dict)
+    return await allm(prompt, client, model_choice)
+
+
+async def aevaluate_answer(query, answer, eval_model, client):
+    """
+    Asynchronous counterpart of `evaluate_answer`, using `client` (see `allm`).
+    """
+    relevance, explanation, eval_tokens = await aevaluate_relevance(
+        query, answer, eval_model, client
+    )
+    return {"relevance": relevance, "explanation": explanation, "tokens": eval_tokens}
+
+
+def get_answer(
+    query, title_query, model_choice, search_type, on_token=None, evaluate=False
+):  # pylint: disable=too-many-arguments
     """
     Generate an answer based on a query using search results and a language model.
 
@@ -564,6 +667,12 @@ def get_answer(query, title_query, model_choice, search_type):
         title_query (str): An optional title filter to narrow the search.
         model_choice (str): The model to use for generating the answer.
         search_type (str): The type of search to perform ("Text", "Vector", or "Hybrid").
+        on_token (callable, optional): Streams the answer to `on_token` as it
+                                       is generated (see `llm`).
+        evaluate (bool, optional): Whether to judge the answer's relevance with
+                                   EVAL_MODEL, a second LLM call. If False, the
+                                   evaluation fields hold SKIPPED_EVALUATION.
+                                   Defaults to False.
 
     Returns:
         dict: The generated answer and related metadata.
@@ -572,13 +681,46 @@ def get_answer(query, title_query, model_choice, search_type):
     tags, titles = process_search_results(search_results)
 
     context = build_context(search_results)
-    answer, tokens, response_time = generate_answer(query, context, model_choice)
+    completion = generate_answer(query, context, model_choice, on_token)
+
+    if evaluate:
+        evaluation = evaluate_answer(query, completion[0], EVAL_MODEL)
+    else:
+        evaluation = SKIPPED_EVALUATION
 
-    eval_model = os.getenv("EVAL_MODEL", "ollama/gemma:2b")
-    evaluation = evaluate_answer(query, answer, eval_model)
+    return build_answer_data(completion, tags, titles, model_choice, evaluation)
+
+
+def get_answer_with_eval(query, title_query, model_choice, search_type):
+    """
+    Generate an answer with `get_answer` and evaluate its relevance.
 
+    Returns:
+        dict: The generated answer, its evaluation and related metadata.
+    """
+    return get_answer(query, title_query, model_choice, search_type, evaluate=True)
+
+
+def build_answer_data(completion, tags, titles, model_choice, evaluation):
+    """
+    Assemble the answer record returned by `get_answer` and its async and
+    batch counterparts (see `utils.query_async`).
+
+    Args:
+        completion (tuple): The answer (str), token usage (dict) and response
+                            time (float), as returned by `generate_answer`.
+        tags (str): The tags of the search results.
+        titles (set): The titles of the search results.
+        model_choice (str): The model used for generating the answer.
+        evaluation (dict): The answer's evaluation by EVAL_MODEL (see
+                           `evaluate_answer`), or SKIPPED_EVALUATION.
+
+    Returns:
+        dict: The generated answer and related metadata.
+    """
+    answer, tokens, response_time = completion
     openai_cost = calculate_openai_cost(model_choice, tokens) + calculate_openai_cost(
-        eval_model, evaluation["tokens"]
+        EVAL_MODEL, evaluation["tokens"]
     )
 
     return {
@@ -0,0 +1,140 @@
+"""
+This module provides the asynchronous and batch counterparts of
+`utils.query.get_answer`. Its functions are used to:
+    1. Answer a question with async LLM clients, so many questions can be
+       answered concurrently on one event loop.
+    2. Answer several questions at once, batching their searches.
+"""
+
+import asyncio
+from contextlib import nullcontext
+
+from utils.query import (
+    SKIPPED_EVALUATION,
+    aevaluate_answer,
+    agenerate_answer,
+    build_answer_data,
+    build_context,
+    create_async_llm_client,
+    process_search_results,
+)
+from utils.search import get_search_results, get_search_results_batch
+from utils.variables import EVAL_MODEL
+
+# Concurrently answered queries in get_answers
+ANSWER_MAX_CONCURRENCY = 16
+
+
+async def get_answer_async(
+    query, title_query, model_choice, search_type, evaluate=False
+):
+    """
+    Asynchronous counterpart of `get_answer`.
+
+    The blocking search runs in a worker thread, the answer and evaluation are
+    generated with async clients, and the evaluation runs as a task while the
+    tags and titles are extracted, so many questions can be answered
+    concurrently on one event loop.
+
+    Args:
+        query (str): The main question or query.
+        title_query (str): An optional title filter to narrow the search.
+        model_choice (str): The model to use for generating the answer.
+        search_type (str): The type of search to perform ("Text", "Vector", or "Hybrid").
+        evaluate (bool, optional): Whether to judge the answer's relevance
+                                   (see `get_answer`). Defaults to False.
+
+    Returns:
+        dict: The generated answer and related metadata.
+    """
+
+    client = create_async_llm_client(model_choice)
+    eval_client = create_async_llm_client(EVAL_MODEL) if evaluate else None
+
+    async with client, eval_client or nullcontext():
+        search_results = await asyncio.to_thread(
+            get_search_results, query, title_query, search_type
+        )
+
+        return await _agenerate_answer_data(
+            query,
+            search_results,
+            model_choice,
+            client,
+            eval_client,
+            evaluate=evaluate,
+        )
+
+
+def get_answers(queries, title_queries, model_choice, search_type, evaluate=False):
+    """
+    Generate answers for several queries at once.
+
+    All searches are batched (see `get_search_results_batch`), then the
+    answers (and evaluations) of the queries are generated concurrently, at
+    most ANSWER_MAX_CONCURRENCY queries at a time.
+
+    Args:
+        queries (list of str): The questions or queries.
+        title_queries (list of str): The title filter of each query (None for no filter).
+        model_choice (str): The model to use for generating the answers.
+        search_type (str): The type of search to perform ("Text", "Vector", or "Hybrid").
+        evaluate (bool, optional): Whether to judge the answers' relevance
+                                   (see `get_answer`). Defaults to False.
+
+    Returns:
+        list of dict: The generated answer and related metadata of each query, in order.
+    """
+    search_results = get_search_results_batch(queries, title_queries, search_type)
+
+    async def _answer_all():
+        client = create_async_llm_client(model_choice)
+        eval_client = create_async_llm_client(EVAL_MODEL) if evaluate else None
+        semaphore = asyncio.Semaphore(ANSWER_MAX_CONCURRENCY)
+
+        async def _answer(query, results):
+            async with semaphore:
+                return await _agenerate_answer_data(
+                    query,
+                    results,
+                    model_choice,
+                    client,
+                    eval_client,
+                    evaluate=evaluate,
+                )
+
+        async with client, eval_client or nullcontext():
+            return await asyncio.gather(
+                *[
+                    _answer(query, results)
+                    for query, results in zip(queries, search_results)
+                ]
+            )
+
+    return asyncio.run(_answer_all())
+
+
+async def _agenerate_answer_data(
+    query, search_results, model_choice, client, eval_client=None, evaluate=False
+):  # pylint: disable=too-many-arguments
+    """
+    Generate the answer to `query` from its search results and, if
+    `evaluate`, judge it with `eval_client`, extracting tags and titles
+    while the evaluation runs. Otherwise the evaluation fields hold
+    SKIPPED_EVALUATION.
+    """
+    context = build_context(search_results)
+    completion = await agenerate_answer(query, context, model_choice, client)
+
+    evaluation_task = None
+    if evaluate:
+        evaluation_task = asyncio.create_task(
+            aevaluate_answer(query, completion[0], EVAL_MODEL, eval_client)
+        )
+    tags, titles = process_search_results(search_results)
+
+    evaluation = SKIPPED_EVALUATION
+    if evaluation_task is not None:
+        evaluation = await evaluation_task
+
+    return build_answer_data(completion, tags, titles, model_choice, evaluation)
@@ -11,11 +11,15 @@ questions and group them by episode. The main functionalities include:
 import re
 from collections import defaultdict
 from json import JSONDecodeError
+from operator import itemgetter, methodcaller
 
 from utils.query import build_prompt
-from utils.utils import extract_item_by_keys, parse_json_response
+from utils.utils import parse_json_response
 from utils.variables import OPENAI_CLIENT
 
+# A sentence starting with a capital letter and ending with a "?"
+QUESTION_PATTERN = re.compile(r"[A-Z][^.!?]*\?")
+
 
 def extract_questions(
     episode: dict, min_words: int = 15, max_words: int = 25
@@ -65,7 +69,7 @@ def extract_questions(
     questions = []
 
     # Find all questions in the text
-    potential_questions = re.findall(r"[A-Z][^.!?]*\?", episode["text"])
+    potential_questions = QUESTION_PATTERN.findall(episode["text"])
 
     for question in potential_questions:
         # Count the words in the question
@@ -84,6 +88,46 @@ def extract_questions(
     return questions
 
 
+def extract_questions_many(
+    episodes: list[dict], min_words: int = 15, max_words: int = 25
+) -> list[dict]:
+    """
+    Extracts the questions of several episodes (see `extract_questions`).
+
+    Parameters:
+    ----------
+    episodes : list[dict]
+        The episodes, each with 'id', 'chunk_id' and 'text' keys.
+
+    min_words : int, optional
+        The minimum number of words a valid question should contain. Defaults to 15.
+
+    max_words : int, optional
+        The maximum number of words a valid question should contain. Defaults to 25.
+
+    Returns:
+    -------
+    list[dict]
+        The extracted questions of all episodes, in order.
+    """
+    findall = QUESTION_PATTERN.findall
+    questions = []
+    append = questions.append
+
+    for episode in episodes:
+        for question in findall(episode["text"]):
+            if min_words <= len(question.split()) <= max_words:
+                append(
+                    {
+                        "episode_id": episode["id"],
+                        "chunk_id": episode["chunk_id"],
+                        "question": question.strip(),
+                    }
+                )
+
+    return questions
+
+
 def group_questions_by_episode(questions):
     """
     Group extracted questions by episode.
@@ -154,20 +198,25 @@ def filter_corrupted_qs(questions, original_data):
             "question",
         ]
 
-    def is_question_in_original_text(question, original_data):
-        original_chunk_text = extract_item_by_keys(
-            original_data,
-            id=question["episode_id"],
-            chunk_id=question["chunk_id"],
-        )["text"]
+    # Lowercased text of each (episode, chunk), first occurrence wins
+    original_texts = {}
+    for item in original_data:
+        original_texts.setdefault((item["id"], item["chunk_id"]), item["text"].lower())
+
+    def is_question_in_original_text(question):
+        original_chunk_text = original_texts.get(
+            (question["episode_id"], question["chunk_id"])
+        )
 
-        return question["question"].lower() in original_chunk_text.lower()
+        return (
+            original_chunk_text is not None
+            and question["question"].lower() in original_chunk_text
+        )
 
     intact_questions = [
         question
         for question in questions
-        if is_valid_question(question)
-        and is_question_in_original_text(question, original_data)
+        if is_valid_question(question) and is_question_in_original_text(question)
     ]
 
     return intact_questions
@@ -184,5 +233,4 @@ def count_question_marks(dataset):
         int: The total number of question marks in the list.
     """
 
-    text_list = [ep["text"] for ep in dataset]
-    return sum(text.count("?") for text in text_list)
+    return sum(map(methodcaller("count", "?"), map(itemgetter("text"), dataset)))
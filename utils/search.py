@@ -0,0 +1,766 @@
+"""
+This module provides the Elasticsearch retrieval used to answer questions.
+It includes functions to:
+    1. Run text, KNN and hybrid (RRF) searches, one query at a time or
+       several in a single `_msearch` request.
+    2. Resolve title filters.
+    3. Embed search queries, with a persistent cache.
+    4. Fuse ranked result lists with Reciprocal Rank Fusion (RRF).
+    5. Run the search of a given type ("Text", "Vector" or "Hybrid") for one
+       or several queries.
+"""
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from exceptions.exceptions import ElasticsearchQueryError, QueryTypeWrongValueError
+from utils.embedding_cache import get_or_compute, get_or_compute_many
+from utils.ollama import get_embedding, get_embeddings
+from utils.utils import flatten_list_of_lists, normalize_vector
+from utils.variables import (
+    EMBED_MODEL,
+    EMBEDDING_CACHE_PATH,
+    ES_CLIENT,
+    INDEX_NAME,
+    KNN_NUM_CANDIDATES,
+    OLLAMA_CLIENT,
+)
+
+TITLE_CACHE_TTL = 600
+MAX_TITLE_MATCHES = 1000
+
+# Concurrent searches of the rewritten queries in elastic_search_hybrid_rrf_qr
+QR_MAX_WORKERS = 8
+
+SOURCE_FIELDS = ("text", "title", "tags", "chunk_id", "id")
+# Hybrid searches fetch the (large) chunk text only for the fused top documents
+METADATA_FIELDS = ("title", "tags", "chunk_id", "id")
+
+
+def get_title_filter(title_query):
+    """
+    Build the filter restricting a search to episodes whose title matches
+    `title_query`.
+
+    The fuzzy title match is resolved once (per TITLE_CACHE_TTL seconds) into
+    the exact matching titles, so searches filter with a `terms` query on
+    `title.keyword`, which Elasticsearch caches as a bitset. Falls back to the
+    fuzzy match itself when no titles resolve (e.g. on an index created
+    before `title.keyword` was mapped) or when too many titles match.
+
+    Args:
+        title_query (str): The title filter given by the user.
+
+    Returns:
+        dict: An Elasticsearch filter clause.
+    """
+    titles = _resolve_titles(title_query, int(time.time() // TITLE_CACHE_TTL))
+
+    if titles and len(titles) < MAX_TITLE_MATCHES:
+        return {"terms": {"title.keyword": list(titles)}}
+
+    return {"match": {"title": {"query": title_query, "fuzziness": "AUTO"}}}
+
+
+@lru_cache(maxsize=256)
+def _resolve_titles(title_query, ttl_bucket):  # pylint: disable=unused-argument
+    """
+    Return the distinct titles fuzzily matching `title_query`, cached per
+    `ttl_bucket` so newly indexed episodes are eventually picked up.
+    """
+    response = ES_CLIENT.search(
+        index=INDEX_NAME,
+        body={
+            "size": 0,
+            "query": {"match": {"title": {"query": title_query, "fuzziness": "AUTO"}}},
+            "aggs": {
+                "titles": {
+                    "terms": {"field": "title.keyword", "size": MAX_TITLE_MATCHES}
+                }
+            },
+        },
+    )
+
+    return tuple(
+        bucket["key"] for bucket in response["aggregations"]["titles"]["buckets"]
+    )
+
+
+def elastic_search_text(
+    query, title_query=None, boost=None, size=5, source_fields=SOURCE_FIELDS
+):
+    """
+    Perform a text-based search using Elasticsearch.
+
+    Args:
+        query (str): The main query string to search for.
+        title_query (str, Optional): An optional title filter to narrow the search.
+        boost (float, Optional): An optional boost to the qeury
+        size (int): Number of documents to retrieve, Default is 5.
+        source_fields (tuple, Optional): The document fields to return,
+                                         Default is SOURCE_FIELDS.
+
+    Returns:
+        list: A list of search results matching the query.
+    """
+    search_query = build_text_search_query(
+        query, title_query, boost, size, source_fields
+    )
+    return _hits(_search(search_query, title_query))
+
+
+def build_text_search_query(
+    query, title_query=None, boost=None, size=5, source_fields=SOURCE_FIELDS
+):
+    """
+    Build the request body of a text-based search (see `elastic_search_text`).
+
+    Returns:
+        dict: The Elasticsearch search request body.
+    """
+    search_query = {
+        "_source": list(source_fields),
+        "size": size,
+        "query": {
+            "bool": {
+                "must": {
+                    "multi_match": {
+                        "query": query,
+                        "fields": ["text", "title"],
+                        "type": "best_fields",
+                    }
+                }
+            }
+        },
+    }
+
+    if title_query:
+        search_query["query"]["bool"]["filter"] = get_title_filter(title_query)
+
+    if boost:
+        search_query["query"]["bool"]["must"]["multi_match"]["boost"] = boost
+
+    return search_query
+
+
+def elastic_search_knn(
+    query_vector,
+    title_query=None,
+    boost=None,
+    size=5,
+    source_fields=SOURCE_FIELDS,
+    num_candidates=None,
+):  # pylint: disable=too-many-arguments
+    """
+    Perform a K-Nearest Neighbors (KNN) search using Elasticsearch.
+
+    Args:
+        query_vector (list): The query vector for similarity search.
+        title_query (str, Optional): An optional title filter to narrow the search.
+        boost (float, Optional): An optional boost to the qeury
+        size (int): Number of documents to retrieve, Default is 5.
+        source_fields (tuple, Optional): The document fields to return,
+                                         Default is SOURCE_FIELDS.
+        num_candidates (int, Optional): The number of candidates the HNSW search
+                                        visits per shard (at least `size`),
+                                        Default is KNN_NUM_CANDIDATES.
+
+    Returns:
+        list: A list of search results matching the query.
+
+    Notes:
+        `num_candidates` is the main cost knob of the query: raising it
+        improves recall at a roughly linear cost. KNN_NUM_CANDIDATES is an
+        env var, default 200.
+    """
+    search_query = build_knn_search_query(
+        query_vector, title_query, boost, size, source_fields, num_candidates
+    )
+    return _hits(_search(search_query, title_query))
+
+
+def build_knn_search_query(
+    query_vector,
+    title_query=None,
+    boost=None,
+    size=5,
+    source_fields=SOURCE_FIELDS,
+    num_candidates=None,
+):  # pylint: disable=too-many-arguments
+    """
+    Build the request body of a KNN search (see `elastic_search_knn`).
+
+    Returns:
+        dict: The Elasticsearch search request body.
+    """
+    knn = {
+        "field": "text_vector",
+        "query_vector": normalize_vector(query_vector).tolist(),
+        "k": size,
+        "num_candidates": max(num_candidates or KNN_NUM_CANDIDATES, size),
+    }
+
+    if title_query:
+        knn["filter"] = get_title_filter(title_query)
+
+    if boost:
+        knn["boost"] = boost
+
+    return {
+        "knn": knn,
+        "size": size,
+        "_source": list(source_fields),
+    }
+
+
+def elastic_search_text_batch(queries, title_queries=None, size=5):
+    """
+    Perform several text-based searches in a single `_msearch` request.
+
+    Args:
+        queries (list of str): The query strings to search for.
+        title_queries (list of str, Optional): The title filter of each query
+                                               (None for no filter).
+        size (int): Number of documents to retrieve per query, Default is 5.
+
+    Returns:
+        list of list of dict: The search results of each query, in order.
+    """
+    title_queries = title_queries or [None] * len(queries)
+    return _msearch(
+        [
+            build_text_search_query(query, title_query, size=size)
+            for query, title_query in zip(queries, title_queries)
+        ],
+        title_queries,
+    )
+
+
+def elastic_search_knn_batch(query_vectors, title_queries=None, size=5):
+    """
+    Perform several KNN searches in a single `_msearch` request.
+
+    Args:
+        query_vectors (list of list): The query vectors for similarity search.
+        title_queries (list of str, Optional): The title filter of each query
+                                               (None for no filter).
+        size (int): Number of documents to retrieve per query, Default is 5.
+
+    Returns:
+        list of list of dict: The search results of each query vector, in order.
+    """
+    title_queries = title_queries or [None] * len(query_vectors)
+    return _msearch(
+        [
+            build_knn_search_query(query_vector, title_query, size=size)
+            for query_vector, title_query in zip(query_vectors, title_queries)
+        ],
+        title_queries,
+    )
+
+
+def _preference(title_query):
+    """
+    Stable shard-copy routing key, so repeated queries for a title hit the
+    same shard copies (and their warm caches).
+    """
+    return hashlib.md5((title_query or "").encode("utf-8")).hexdigest()
+
+
+def _search(search_query, title_query=None):
+    """
+    Run a search with the shard request cache enabled and a stable `preference`.
+    """
+    return ES_CLIENT.search(
+        index=INDEX_NAME,
+        body=search_query,
+        request_cache=True,
+        preference=_preference(title_query),
+    )
+
+
+def _msearch(search_queries, title_queries):
+    """
+    Run several searches in a single `_msearch` round-trip.
+
+    Args:
+        search_queries (list of dict): Search request bodies.
+        title_queries (list of str): The title filter of each search (or None),
+                                     used for its `preference`.
+
+    Returns:
+        list of list of dict: The hits of each search, in order.
+
+    Raises:
+        ElasticsearchQueryError: If any of the searches failed.
+    """
+    searches = []
+    for search_query, title_query in zip(search_queries, title_queries):
+        searches.append(
+            {
+                "index": INDEX_NAME,
+                "request_cache": True,
+                "preference": _preference(title_query),
+            }
+        )
+        searches.append(search_query)
+
+    responses = ES_CLIENT.msearch(searches=searches)["responses"]
+
+    for response in responses:
+        if "error" in response:
+            raise ElasticsearchQueryError(f"msearch failed: {response['error']}")
+
+    return [_hits(response) for response in responses]
+
+
+def _hits(response):
+    """
+    Flatten the hits of a search response into result dictionaries.
+
+    Each hit's `_source` dictionary is reused (with its '_id' and '_score'
+    added) rather than copied.
+    """
+    results = []
+    for hit in response["hits"]["hits"]:
+        document = hit["_source"]
+        document["_id"] = hit["_id"]
+        document["_score"] = hit["_score"]
+        results.append(document)
+    return results
+
+
+def _fetch_texts(documents):
+    """
+    Add the 'text' field to search results fetched without it, with a
+    single `mget` request.
+
+    Args:
+        documents (list of dict): Search results, each having an '_id' key.
+
+    Returns:
+        list of dict: The same `documents`, updated in place.
+    """
+    if not documents:
+        return documents
+
+    response = ES_CLIENT.mget(
+        index=INDEX_NAME, ids=[doc["_id"] for doc in documents], source=["text"]
+    )
+    texts = {
+        doc["_id"]: doc["_source"]["text"] for doc in response["docs"] if doc["found"]
+    }
+    for document in documents:
+        document["text"] = texts.get(document["_id"], "")
+
+    return documents
+
+
+def compute_rrf(rank, k=60):
+    """
+    Compute the Reciprocal Rank Fusion (RRF) score for a given document rank.
+
+    The RRF score is calculated as 1 / (k + rank), where 'k' is a tunable
+    parameter that defines how much emphasis is placed on lower-ranked results.
+
+    Parameters:
+    ----------
+    rank : int or np.ndarray
+        The rank of the document (1-based index), or an array of ranks.
+    k : int, optional
+        The constant used to adjust the impact of the rank in the RRF calculation.
+        Default is 60.
+
+    Returns:
+    -------
+    float or np.ndarray
+        The reciprocal relevance score for the document(s).
+    """
+    return 1 / (k + rank)
+
+
+def compute_documents_rrf(k, *results_args):
+    """
+    Calculate the RRF scores for documents from multiple result sets.
+
+    This function computes the cumulative RRF score for each document
+    across multiple ranked result sets.
+
+    Parameters:
+    ----------
+    k : int
+        The constant used in the RRF calculation.
+    *results_args : list of list of dict
+        Each argument is a list of results, where each result is a dictionary
+        representing a document with an '_id' key. The rank is derived from the
+        index within each result list; repeated documents within a list only
+        count at their first rank.
+
+    Returns:
+    -------
+    list of tuple
+        A list of tuples where each tuple contains a document ID and its
+        cumulative RRF score, sorted in descending order by score.
+
+    Notes:
+    -----
+    The scores are computed and summed with numpy, so the cost stays low
+    for many result sets (e.g. many rewritten queries).
+    """
+    # Score each document once per result set, at its first (best) rank
+    doc_ids, ranks = [], []
+    for results in results_args:
+        seen = set()
+        for rank, hit in enumerate(results, start=1):
+            if hit["_id"] not in seen:
+                seen.add(hit["_id"])
+                doc_ids.append(hit["_id"])
+                ranks.append(rank)
+
+    if not doc_ids:
+        return []
+
+    ranks = np.array(ranks)
+    unique_ids, first_index, inverse = np.unique(
+        np.array(doc_ids), return_index=True, return_inverse=True
+    )
+    # Sum the scores of each document, in order of appearance
+    rrf_scores = np.bincount(inverse, weights=compute_rrf(ranks, k))
+
+    # By descending score, ties broken by first appearance
+    order = np.lexsort((first_index, -rrf_scores))
+    return [(str(unique_ids[i]), float(rrf_scores[i])) for i in order]
+
+
+def elastic_search_hybrid_rrf(
+    query, query_vector, k=60, title_query=None, vector_boost=None
+):
+    """
+    Perform a hybrid search using Elasticsearch by combining text-based and
+    vector-based search results, then re-ranking them using RRF.
+
+    Parameters:
+    ----------
+    query : str
+        The text query used for the traditional keyword search.
+    query_vector : list or ndarray
+        The vector representing the query, used for the k-NN (vector) search.
+    k : int, optional
+        The constant used in the RRF calculation. Default is 60.
+    title_query : str, optional
+        An additional query for targeting specific fields like titles.
+    vector_boost : float, optional
+        The weight assigned to the vector-based search results relative to
+        the text-based results. Must be a float between 0 and 1. If None,
+        both text and vector search are given equal weight (0.5).
+
+    Returns:
+    -------
+    list of dict
+        A list of the top-K documents, sorted by their RRF score. Each document
+        contains its original content plus an additional key 'rrf_score'
+        indicating its RRF score.
+
+    Raises:
+    -------
+    AssertionError
+        If vector_boost is provided but is not a float between 0 and 1.
+    """
+    return _fetch_texts(
+        _hybrid_search_metadata(query, query_vector, k, title_query, vector_boost)
+    )
+
+
+def _hybrid_search_metadata(query, query_vector, k, title_query, vector_boost):
+    """
+    Run the hybrid search without fetching the chunk texts, which are only
+    needed for the fused top documents (see `_fetch_texts`).
+
+    The KNN and text searches are sent together in a single `_msearch`
+    request, which Elasticsearch runs in parallel.
+    """
+    knn_results, keyword_results = _msearch(
+        build_hybrid_search_queries(query, query_vector, title_query, vector_boost),
+        [title_query, title_query],
+    )
+
+    return fuse_rrf(k, knn_results, keyword_results)
+
+
+def build_hybrid_search_queries(
+    query, query_vector, title_query=None, vector_boost=None
+):
+    """
+    Build the request bodies of the KNN and text searches of a hybrid search,
+    both returning 10 documents without their chunk text.
+
+    Returns:
+        list of dict: The KNN and text search request bodies.
+    """
+    vector_boost, text_boost = _hybrid_boosts(vector_boost)
+
+    return [
+        build_knn_search_query(
+            query_vector, title_query, vector_boost, 10, METADATA_FIELDS
+        ),
+        build_text_search_query(query, title_query, text_boost, 10, METADATA_FIELDS),
+    ]
+
+
+def _hybrid_boosts(vector_boost):
+    """
+    Validate `vector_boost` and return the (vector_boost, text_boost) pair
+    used by the hybrid search; both default to 0.5.
+    """
+    assert vector_boost is None or (
+        isinstance(vector_boost, (float, int)) and 0 <= vector_boost <= 1
+    ), (
+        f"Incorrect value '{vector_boost}' for vector_boost, "
+        "must be a float or int between [0, 1] or None"
+    )
+
+    if vector_boost:
+        return vector_boost, 1 - vector_boost
+
+    return 0.5, 0.5
+
+
+def fuse_rrf(k, *results_args, top_n=5):
+    """
+    Merge several ranked result lists with RRF and return the top documents.
+
+    Parameters:
+    ----------
+    k : int
+        The constant used in the RRF calculation.
+    *results_args : list of list of dict
+        Ranked result lists, each document having an '_id' key.
+    top_n : int, optional
+        The number of documents to return. Default is 5.
+
+    Returns:
+    -------
+    list of dict
+        The top `top_n` documents by RRF score, each with an added
+        'rrf_score' key.
+    """
+    # First occurrence of each document, by id
+    doc_by_id = {}
+    for results in results_args:
+        for doc in results:
+            doc_by_id.setdefault(doc["_id"], doc)
+
+    rrf_scores = compute_documents_rrf(k, *results_args)
+
+    # Get top-K documents by the score
+    final_results = []
+    for doc_id, rrf_score in rrf_scores[:top_n]:
+        doc = doc_by_id[doc_id]
+        doc["rrf_score"] = rrf_score
+        final_results.append(doc)
+
+    return final_results
+
+
+def elastic_search_hybrid_rrf_qr(
+    query, query_rewriting_results, k=60, title_query=None, vector_boost=None
+):
+    """
+    Performs a hybrid search using the original query and rewritten results,
+    applying Reciprocal Rank Fusion (RRF) to rank and merge the results.
+
+    The function takes the original query and its rewritten variations,
+    conducts a hybrid search for each (concurrently, on up to QR_MAX_WORKERS
+    threads), and then applies RRF to combine and rank the results. The top
+    `k` results based on the RRF score are returned.
+
+    Parameters:
+    -----------
+    query : str
+        The original query string.
+    query_rewriting_results : list of str
+        A list of rewritten queries derived from the original query.
+    k : int, optional
+        The number of top results to return after applying RRF, default is 60.
+    title_query : str, optional
+        An additional query parameter for title-based search, default is None.
+    vector_boost : float, optional
+        A boost value for vector-based search results, default is None.
+
+    Returns:
+    --------
+    list of dict
+        A list of the top `k` search results, each containing the RRF score.
+    """
+
+    queries = query_rewriting_results + [query]
+    query_vectors = embed_queries(queries)
+
+    def _search_one(query, query_vector):
+        return _hybrid_search_metadata(
+            query=query,
+            query_vector=query_vector,
+            k=k,
+            title_query=title_query,
+            vector_boost=vector_boost,
+        )
+
+    # The searches only wait on the network, so run them concurrently
+    with ThreadPoolExecutor(max_workers=min(len(queries), QR_MAX_WORKERS)) as pool:
+        results = list(pool.map(_search_one, queries, query_vectors))
+
+    return _fetch_texts(fuse_rrf(k, *results))
+
+
+def embed_query(query):
+    """
+    Embed a search query with EMBED_MODEL.
+
+    Embeddings are kept in the persistent cache at EMBEDDING_CACHE_PATH, so
+    repeated queries aren't re-embedded, even across restarts.
+
+    Args:
+        query (str): The search query.
+
+    Returns:
+        list: The embedding of the query as a list of floats.
+    """
+    return get_or_compute(
+        EMBEDDING_CACHE_PATH,
+        EMBED_MODEL,
+        " ".join(query.split()),
+        lambda text: get_embedding(OLLAMA_CLIENT, text, EMBED_MODEL),
+    )
+
+
+def embed_queries(queries):
+    """
+    Embed several search queries with EMBED_MODEL, sending all the queries
+    missing from the persistent cache (see `embed_query`) in one request.
+
+    Args:
+        queries (list of str): The search queries.
+
+    Returns:
+        list: The embeddings of the queries, in order, as lists of floats.
+    """
+    return get_or_compute_many(
+        EMBEDDING_CACHE_PATH,
+        EMBED_MODEL,
+        [" ".join(query.split()) for query in queries],
+        lambda texts: get_embeddings(OLLAMA_CLIENT, texts, EMBED_MODEL),
+    )
+
+
+def get_search_results(query, title_query, search_type, num_candidates=None):
+    """
+    Perform a search based on the specified search type.
+
+    This function supports different search methods, including vector-based,
+    text-based, and hybrid approaches. It returns results based on the selected
+    search type.
+
+    Parameters:
+    ----------
+    query : str
+        The main search query to be processed.
+    title_query : str
+        An optional query to target specific fields like titles.
+    search_type : str
+        The type of search to perform. It must be one of the following:
+        - "Vector": Performs a k-NN (vector-based) search using the query embedding.
+        - "Text": Performs a traditional keyword search.
+        - "Hybrid": Combines the results of both vector-based and text-based searches,
+          re-ranking the documents using Reciprocal Rank Fusion (RRF).
+    num_candidates : int, optional
+        The number of candidates of a "Vector" search (see `elastic_search_knn`).
+
+    Returns:
+    -------
+    list of dict
+        A list of search results. Each result is a dictionary containing the relevant
+        information about a document.
+
+    Raises:
+    -------
+    QueryTypeWrongValueError
+        If `search_type` is not one of "Text", "Vector", or "Hybrid".
+    """
+    if search_type == "Vector":
+        query_vector = embed_query(query)
+        return elastic_search_knn(
+            query_vector, title_query, num_candidates=num_candidates
+        )
+
+    if search_type == "Text":
+        return elastic_search_text(query, title_query)
+
+    if search_type == "Hybrid":
+        query_vector = embed_query(query)
+        return elastic_search_hybrid_rrf(query, query_vector, title_query=title_query)
+
+    raise QueryTypeWrongValueError(
+        "`search_type` must be either 'Text', 'Vector', or 'Hybrid'"
+    )
+
+
+def get_search_results_batch(queries, title_queries, search_type):
+    """
+    Perform the searches of several queries at once.
+
+    Query embeddings are computed in a single embedding request and all the
+    searches are sent in a single `_msearch` request.
+
+    Parameters:
+    ----------
+    queries : list of str
+        The search queries.
+    title_queries : list of str
+        The title filter of each query (None for no filter).
+    search_type : str
+        "Text", "Vector", or "Hybrid" (see `get_search_results`).
+
+    Returns:
+    -------
+    list of list of dict
+        The search results of each query, in order.
+
+    Raises:
+    -------
+    QueryTypeWrongValueError
+        If `search_type` is not one of "Text", "Vector", or "Hybrid".
+    """
+    if search_type not in ("Text", "Vector", "Hybrid"):
+        raise QueryTypeWrongValueError(
+            "`search_type` must be either 'Text', 'Vector', or 'Hybrid'"
+        )
+
+    if search_type == "Text":
+        return elastic_search_text_batch(queries, title_queries)
+
+    query_vectors = embed_queries(queries)
+
+    if search_type == "Vector":
+        return elastic_search_knn_batch(query_vectors, title_queries)
+
+    search_queries = []
+    search_title_queries = []
+    for query, query_vector, title_query in zip(queries, query_vectors, title_queries):
+        search_queries.extend(
+            build_hybrid_search_queries(query, query_vector, title_query)
+        )
+        search_title_queries.extend([title_query, title_query])
+
+    results = _msearch(search_queries, search_title_queries)
+
+    search_results = [
+        fuse_rrf(60, knn_results, keyword_results)
+        for knn_results, keyword_results in zip(results[::2], results[1::2])
+    ]
+    _fetch_texts(flatten_list_of_lists(search_results))
+
+    return search_results
@@ -0,0 +1,36 @@
+"""
+This module provides the SQLite connections backing the persistent caches
+(see `utils.embedding_cache` and `utils.llm_cache`).
+
+A connection is opened once per (cache file, table) and shared between
+threads; callers serialize their statements with `LOCK`.
+"""
+
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+
+LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def get_connection(cache_path, create_table_sql):
+    """
+    Open (and create if needed) the SQLite cache at `cache_path`.
+
+    Args:
+        cache_path (str): Path to the SQLite cache file.
+        create_table_sql (str): The `CREATE TABLE IF NOT EXISTS` statement of
+                                the cache table.
+
+    Returns:
+        sqlite3.Connection: A connection shared between threads.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    conn = sqlite3.connect(cache_path, check_same_thread=False)
+    # WAL lets several processes read while one writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(create_table_sql)
+    conn.commit()
+    return conn
@@ -13,8 +13,13 @@ import gc
 import json
 import os
 import pickle
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+import torch
 from datasets import Dataset, load_dataset
 from tqdm.auto import tqdm
 from transformers import WhisperForConditionalGeneration, WhisperProcessor
@@ -22,10 +27,10 @@ from transformers import WhisperForConditionalGeneration, WhisperProcessor
 from utils.asr import read_mp3, transcribe_episode
 from utils.chunking import chunk_large_text, preindex_process_text
 from utils.elasticsearch import (
+    bulk_index_documents,
     create_elasticsearch_index,
     get_index_mapping,
     get_indexed_documents_count,
-    index_document,
     load_index_settings,
     remove_elasticsearch_index,
     search_elasticsearch_indecis,
@@ -43,11 +48,12 @@ from utils.grafana import (
     is_grafana_token_valid,
 )
 from utils.multithread import map_progress
-from utils.ollama import embed_document
+from utils.ollama import embed_documents_batch
 from utils.utils import (
     create_or_update_dotenv_var,
     get_json_files_in_dir,
     initialize_env_variables,
+    normalize_vector,
     print_log,
     read_json_file,
     save_json_file,
@@ -56,10 +62,12 @@ from utils.utils import (
 )
 from utils.variables import (
     CACHE_DIR,
+    EPISODE_LOAD_WORKERS,
     ES_CLIENT,
     EXPECTED_MAPPING,
     INDEX_NAME,
     INDEX_SETTINGS_PATH,
+    OLLAMA_EMBED_BATCH_SIZE,
     POSTGRES_DB,
     POSTGRES_GRAFANA_HOST,
     POSTGRES_PASSWORD,
@@ -68,6 +76,9 @@ from utils.variables import (
     PROJECT_DIR,
 )
 
+# Embedded batches waiting to be indexed in _embed_and_index_documents
+EMBED_QUEUE_SIZE = 4
+
 
 def load_podcast_data(
     new_episodes_dirs=None,
@@ -89,26 +100,16 @@ def load_podcast_data(
         return None
 
     if new_episodes_dirs:
-        dataset = []
-        for dir_ in new_episodes_dirs:
-            audio, sampling_rate = read_mp3(
-                os.path.join(
-                    PROJECT_DIR, f"bucket/{dir_}/{os.getenv('NEW_AUDIOS_NAME')}.mp3"
-                )
-            )
-            audio = standardize_array(audio)
-
-            episode = read_json_file(
-                os.path.join(PROJECT_DIR, f"bucket/{dir_}/metadata.json")
-            )
-            episode["audio"] = {
-                "array": audio,
-                "sampling_rate": sampling_rate,
-            }
-
-            dataset.append(episode)
-            del audio
-            gc.collect()
+        # pydub decodes in ffmpeg subprocesses, so threads decode in parallel.
+        # Each in-flight episode holds its AudioSegment, raw samples and
+        # float32 copy, so peak memory grows with the worker count: keep it
+        # small (EPISODE_LOAD_WORKERS) rather than one per core.
+        dataset = map_progress(
+            f=_load_new_episode,
+            seq=new_episodes_dirs,
+            max_workers=EPISODE_LOAD_WORKERS,
+        )
+        gc.collect()
 
         return dataset
 
@@ -119,6 +120,23 @@ def load_podcast_data(
     )["train"]
 
 
+def _load_new_episode(dir_):
+    """
+    Load the standardized audio and the metadata of a new episode in the bucket.
+    """
+    audio, sampling_rate = read_mp3(
+        os.path.join(PROJECT_DIR, f"bucket/{dir_}/{os.getenv('NEW_AUDIOS_NAME')}.mp3")
+    )
+
+    episode = read_json_file(os.path.join(PROJECT_DIR, f"bucket/{dir_}/metadata.json"))
+    episode["audio"] = {
+        "array": standardize_array(audio),
+        "sampling_rate": sampling_rate,
+    }
+
+    return episode
+
+
 def create_whisper_processor_and_model(
     asr_model_name=None, cache_dir=None, defacto=True
 ):
@@ -145,6 +163,10 @@ def create_whisper_processor_and_model(
     )
     model.config.forced_decoder_ids = None
 
+    # Half precision on GPU: half the memory and tensor-core matmuls
+    if torch.cuda.is_available():
+        model = model.to(device="cuda", dtype=torch.float16)
+
     return processor, model
 
 
@@ -166,7 +188,11 @@ def transcripe_and_cache_episodes(
         print_log("transcripe_and_cache_episodes: Defacto mode is on ...")
         return
 
-    cached_episodes = get_json_files_in_dir(transcripts_cache_dir)
+    # Titles of the cached transcripts, cached as "<title>.json"
+    cached_episodes = {
+        Path(file_name).stem
+        for file_name in get_json_files_in_dir(transcripts_cache_dir)
+    }
     dataset_len = len(dataset)
 
     for i in tqdm(range(0, dataset_len)):
@@ -216,11 +242,12 @@ def load_cached_episodes(
         print_log("load_cached_episodes: Defacto mode is on ...")
         return None
 
-    dataset = []
-    for path in get_json_files_in_dir(transcripts_cache_dir, return_full_path=True):
-        dataset.append(read_json_file(path))
-
-    return dataset
+    # Transcript reads overlap in threads
+    return map_progress(
+        f=read_json_file,
+        seq=get_json_files_in_dir(transcripts_cache_dir, return_full_path=True),
+        verbose=False,
+    )
 
 
 def chunk_episodes(
@@ -264,14 +291,15 @@ def chunk_episodes(
             "Object is neither a list of dictionaries nor a Hugging Face Dataset."
         )
 
+    # spaCy sentence splitting is CPU-bound: one process per core
     documents = map_progress(
-        f=lambda episode: preindex_process_text(
-            episode=episode,
+        f=partial(
+            preindex_process_text,
             chunking_function=chunking_function,
             max_chunk_size=max_chunk_size,
         ),
         seq=Dataset.from_list(dataset),
-        max_workers=4,
+        processes=True,
     )
     documents = [item for sublist in documents for item in sublist]
 
@@ -329,32 +357,20 @@ def index_documents_es(
         ## ====> Model
         embed_model_name = os.environ.get("EMBED_MODEL")
 
-        print("Starting documents vectorization ...")
         if "text_vector" not in documents[0]:
-            vectorized_documents = map_progress(
-                f=lambda document: embed_document(
-                    ollama_client, document, embed_model_name
-                ),
-                seq=documents,
-                max_workers=4,
+            print("Starting documents vectorization and indexing in es ...")
+            status = _embed_and_index_documents(
+                ollama_client, es_client, index_name, documents, embed_model_name
             )
         else:
-            vectorized_documents = documents
-        print("Documents vectorization done.")
-
-        ## ====> Indexing...
-        print("Starting documents indexing in es ...")
-        status = map_progress(
-            f=lambda document: index_document(
-                es_client, index_name, document, timeout=60
-            ),
-            seq=vectorized_documents,
-            max_workers=4,
-        )
+            print("Starting documents indexing in es ...")
+            for document in documents:
+                document["text_vector"] = normalize_vector(document["text_vector"])
+            status = bulk_index_documents(es_client, index_name, documents, timeout=60)
         print("Documents indexing done.")
 
-        n_removed_docs = sum(st["removed"] for st in status)
-        n_indexed_docs = sum(st["indexed"] for st in status)
+        n_removed_docs = status["removed"]
+        n_indexed_docs = status["indexed"]
 
         print(f"Documents removed: {n_removed_docs}")
         print(f"Documents indexed: {n_indexed_docs}")
@@ -367,6 +383,65 @@ def index_documents_es(
     )
 
 
+def _embed_and_index_documents(
+    ollama_client, es_client, index_name, documents, embed_model_name
+):
+    """
+    Embed documents in batches of OLLAMA_EMBED_BATCH_SIZE in a background
+    thread while the main thread bulk indexes the batches already embedded,
+    so Ollama and Elasticsearch work at the same time. At most
+    EMBED_QUEUE_SIZE embedded batches wait to be indexed.
+
+    Returns:
+        dict: The number of documents removed and indexed.
+    """
+    batches = queue.Queue(maxsize=EMBED_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for offset in range(0, len(documents), OLLAMA_EMBED_BATCH_SIZE):
+                if stop.is_set():
+                    break
+                batch = embed_documents_batch(
+                    ollama_client,
+                    documents[offset : offset + OLLAMA_EMBED_BATCH_SIZE],
+                    model_name=embed_model_name,
+                    batch_size=OLLAMA_EMBED_BATCH_SIZE,
+                )
+                # Unit-norm vectors, as required by the dot_product similarity
+                for document in batch:
+                    document["text_vector"] = normalize_vector(document["text_vector"])
+                batches.put(batch)
+        finally:
+            batches.put(None)
+
+    status = {"removed": 0, "indexed": 0}
+    with ThreadPoolExecutor(max_workers=1) as producer, tqdm(
+        total=len(documents)
+    ) as progress:
+        embedding = producer.submit(produce)
+        batch = ()
+        try:
+            while (batch := batches.get()) is not None:
+                batch_status = bulk_index_documents(
+                    es_client, index_name, batch, timeout=60, verbose=False
+                )
+                status["removed"] += batch_status["removed"]
+                status["indexed"] += batch_status["indexed"]
+                progress.update(len(batch))
+        finally:
+            # Unblock and stop the producer if indexing failed
+            stop.set()
+            while batch is not None:
+                batch = batches.get()
+
+        # Raise embedding errors, if any
+        embedding.result()
+
+    return status
+
+
 def check_for_new_data(bucket_dir):
     """
     Check for new directories in the bucket directory.
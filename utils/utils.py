@@ -20,6 +20,9 @@ from dotenv import dotenv_values, load_dotenv, set_key
 
 from exceptions.exceptions import SetupWrongParam
 
+# Parameters inside curly braces, excluding those with quotes
+PARAMETER_PATTERN = re.compile(r"\{([^\"'{}]+)\}")
+
 
 def print_log(*message):
     """
@@ -42,9 +45,7 @@ def find_parameters(text):
     Returns:
         list: A list of parameter names found in the text.
     """
-    # Match parameters inside curly braces excluding those with quotes
-    pattern = r"\{([^\"'{}]+)\}"
-    matches = re.findall(pattern, text)
+    matches = PARAMETER_PATTERN.findall(text)
     return [match.strip() for match in matches]
 
 
@@ -429,13 +430,78 @@ def standardize_array(array):
     Standardize a numpy array by subtracting the mean and
         dividing by the standard deviation.
 
+    The array is converted to float32 once (e.g. from int16 samples) and
+    standardized in place, without float64 intermediates; a float32 input
+    array is modified in place.
+
     Args:
         array (numpy.ndarray): The array to standardize.
 
     Returns:
-        numpy.ndarray: The standardized array.
+        numpy.ndarray: The standardized float32 array.
+    """
+    array = np.asarray(array, dtype=np.float32)
+    array -= array.mean()
+    array /= array.std()
+    return array
+
+
+def normalize_vector(vec):
+    """
+    Scale a vector to unit (L2) norm, so that its dot product with another
+    unit vector equals their cosine similarity.
+
+    Args:
+        vec (array-like): The vector to normalize.
+
+    Returns:
+        numpy.ndarray: The normalized float32 vector (a zero vector is
+                       returned unchanged).
+    """
+    vec = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def quantize_vector(vec, scale=None):
+    """
+    Quantize a float vector to int8 using a single scale for all components.
+
+    Dequantizing multiplies every component by the same scale, so cosine
+    similarity between dequantized vectors matches the original one up to
+    rounding error (about 1/254 of the largest component).
+
+    Args:
+        vec (array-like): The vector to quantize.
+        scale (float, optional): The value of one int8 step. Default is None,
+            which maps the largest absolute component to 127. Pass 1 / 127
+            for unit-norm vectors so that all vectors share the same scale.
+
+    Returns:
+        tuple: The quantized numpy.ndarray (int8) and the scale used.
+    """
+    vec = np.asarray(vec, dtype=np.float32)
+
+    if scale is None:
+        scale = float(np.abs(vec).max()) / 127 or 1.0
+
+    quantized = np.clip(np.round(vec / scale), -128, 127).astype(np.int8)
+    return quantized, scale
+
+
+def dequantize_vector(quantized, scale=1 / 127):
+    """
+    Restore an approximate float32 vector from its int8 quantization.
+
+    Args:
+        quantized (numpy.ndarray): The int8 vector produced by `quantize_vector`.
+        scale (float, optional): The scale returned by `quantize_vector`.
+            Default is 1 / 127, the scale used for unit-norm vectors.
+
+    Returns:
+        numpy.ndarray: The dequantized float32 vector.
     """
-    return (array - array.mean()) / array.std()
+    return quantized.astype(np.float32) * np.float32(scale)
 
 
 def conf():
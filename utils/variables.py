@@ -27,15 +27,37 @@ ES_CLIENT = create_elasticsearch_client(
     port=os.getenv("ELASTIC_PORT"),
 )
 
+OLLAMA_HOST = os.getenv(f"OLLAMA{CONF}_HOST")
+OLLAMA_PORT = os.getenv("OLLAMA_PORT")
+
 OLLAMA_CLIENT = create_ollama_client(
-    ollama_host=os.getenv(f"OLLAMA{CONF}_HOST"),
-    ollama_port=os.getenv("OLLAMA_PORT"),
+    ollama_host=OLLAMA_HOST,
+    ollama_port=OLLAMA_PORT,
 )
 
 OPENAI_CLIENT = create_openai_client()
 
 INDEX_NAME = os.getenv("ES_INDEX_NAME")
 
+EMBED_MODEL = os.getenv("EMBED_MODEL", "nomic-embed-text")
+
+OLLAMA_EMBED_BATCH_SIZE = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "64"))
+
+# Each worker holds a decoded multi-hour episode in memory (see load_podcast_data)
+EPISODE_LOAD_WORKERS = int(os.getenv("EPISODE_LOAD_WORKERS", "2"))
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join(PROJECT_DIR, "data/embedding_cache.sqlite")
+)
+
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join(PROJECT_DIR, "data/llm_cache.sqlite")
+)
+
+EVAL_MODEL = os.getenv("EVAL_MODEL", "ollama/gemma:2b")
+
+KNN_NUM_CANDIDATES = int(os.getenv("KNN_NUM_CANDIDATES", "200"))
+
 INDEX_SETTINGS_PATH = os.path.join(
     PROJECT_DIR, "config/elasticsearch/index_settings.json"
 )